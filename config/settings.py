@@ -140,15 +140,63 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+MAILING_BATCH_SIZE = int(os.getenv("MAILING_BATCH_SIZE") or 100)
+MAILING_ENGINE = os.getenv("MAILING_ENGINE") or "sequential"
+MAILING_WORKERS = int(os.getenv("MAILING_WORKERS") or 4)
+MAILING_ASYNC_SESSIONS = int(os.getenv("MAILING_ASYNC_SESSIONS") or 100)
+MAILING_CHUNK_SIZE = int(os.getenv("MAILING_CHUNK_SIZE") or 500)
+MAILING_ITERATOR_CHUNK_SIZE = int(os.getenv("MAILING_ITERATOR_CHUNK_SIZE") or 2000)
+MAILING_DISPATCH_BATCH_SIZE = int(os.getenv("MAILING_DISPATCH_BATCH_SIZE") or 100)
+MAILING_IMPORT_BATCH_SIZE = int(os.getenv("MAILING_IMPORT_BATCH_SIZE") or 1000)
+
+MAILING_RETRY_MAX_ATTEMPTS = int(os.getenv("MAILING_RETRY_MAX_ATTEMPTS") or 5)
+MAILING_RETRY_BASE_DELAY = int(os.getenv("MAILING_RETRY_BASE_DELAY") or 60)
+MAILING_RETRY_MAX_DELAY = int(os.getenv("MAILING_RETRY_MAX_DELAY") or 3600)
+MAILING_RETRY_BATCH_SIZE = int(os.getenv("MAILING_RETRY_BATCH_SIZE") or 500)
+MAILING_RETRY_LEASE = int(os.getenv("MAILING_RETRY_LEASE") or 600)
+
+# Лимиты скорости отправки в письмах в секунду, 0 — без ограничения
+MAILING_RATE_LIMIT_RELAY = float(os.getenv("MAILING_RATE_LIMIT_RELAY") or 0)
+MAILING_RATE_LIMIT_OWNER = float(os.getenv("MAILING_RATE_LIMIT_OWNER") or 0)
+MAILING_RATE_LIMIT_BURST = int(os.getenv("MAILING_RATE_LIMIT_BURST") or 10)
+
+# Параллелизм и лимит скорости по доменам получателей, например
+# {"gmail.com": {"workers": 4, "rate": 20}, "mail.ru": {"workers": 2, "rate": 5}}.
+# Каждый домен отсюда отправляется своим пулом соединений, остальные — общим
+MAILING_DOMAIN_LIMITS = {}
+MAILING_ATTEMPT_BUFFER_SIZE = int(os.getenv("MAILING_ATTEMPT_BUFFER_SIZE") or 500)
+MAILING_ATTEMPT_FLUSH_INTERVAL = float(os.getenv("MAILING_ATTEMPT_FLUSH_INTERVAL") or 5)
+# Сколько получателей отмечается статусом «Отправка» перед отправкой их писем
+MAILING_CLAIM_BATCH_SIZE = int(os.getenv("MAILING_CLAIM_BATCH_SIZE") or 100)
+
 CACHE_ENABLED = True
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Фрагменты шаблонов кэшируются в памяти процесса: их ключи содержат версию
+    # объекта (updated_at), поэтому сбрасывать их между процессами не нужно
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragments",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
 if CACHE_ENABLED:
-    CACHES_LOCATION = {
-        "default": {
-            "BACKEND": "django.core.cache.backends.redis.RedisCache",
-            "LOCATION": "redis://redis:6379/1",
-        }
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("LOCATION") or "redis://redis:6379/1",
     }
 
+# Кэш процесса перед Redis и блокировка пересчета значения при промахе
+CACHE_LOCAL_MAXSIZE = int(os.getenv("CACHE_LOCAL_MAXSIZE") or 256)
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL") or 5)
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT") or 10)
+# Как часто процесс пишет в лог сводку попаданий кэша, с; 0 — не писать
+CACHE_STATS_INTERVAL = int(os.getenv("CACHE_STATS_INTERVAL") or 300)
+
+REDIS_URL = os.getenv("REDIS_URL") or "redis://redis:6379"
+
 CELERY_BROKER_URL = "redis://redis:6379"
 
 CELERY_RESULT_BACKEND = "redis://redis:6379"
@@ -160,8 +208,12 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
 CELERY_BEAT_SCHEDULE = {
-    "update_notification_email": {
-        "task": "habit_tracker_app_project.habit_tracker.tasks.telegram_notification",
-        "schedule": timedelta(hours=12),
+    "dispatch_due_mailings": {
+        "task": "mail.tasks.dispatch_due_mailings",
+        "schedule": timedelta(minutes=1),
+    },
+    "process_delivery_retries": {
+        "task": "mail.tasks.process_delivery_retries",
+        "schedule": timedelta(minutes=1),
     },
 }
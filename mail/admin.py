@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from mail.models import Mailing, MailingAttempt, Message, Recipient
+from mail.models import (DeadLetter, Mailing, MailingAttempt, MailingDelivery,
+                         Message, Recipient, Suppression)
 
 
 @admin.register(Recipient)
@@ -47,3 +48,31 @@ class MailingAttemptAdmin(admin.ModelAdmin):
         "attempt_datetime",
     )
     search_fields = ("attempt_datetime",)
+
+
+@admin.register(MailingDelivery)
+class MailingDeliveryAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "mailing",
+        "recipient",
+        "status",
+        "attempts",
+        "next_attempt_at",
+    )
+    list_filter = ("status", "next_attempt_at")
+    search_fields = ("recipient__email", "last_error")
+
+
+@admin.register(DeadLetter)
+class DeadLetterAdmin(admin.ModelAdmin):
+    list_display = ("id", "mailing", "email", "code", "created_at")
+    list_filter = ("code", "created_at")
+    search_fields = ("email", "error")
+
+
+@admin.register(Suppression)
+class SuppressionAdmin(admin.ModelAdmin):
+    list_display = ("id", "email", "reason", "created_at")
+    list_filter = ("reason", "created_at")
+    search_fields = ("email",)
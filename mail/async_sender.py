@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from itertools import islice
+
+import aiosmtplib
+from django.conf import settings
+
+RECONNECT_ERRORS = (aiosmtplib.SMTPServerDisconnected, ConnectionError)
+
+
+class AsyncBatchSender:
+    """Асинхронный аналог BatchSender: одна SMTP-сессия на batch_size писем"""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.MAILING_BATCH_SIZE
+        self.client = None
+        self.sent_in_batch = 0
+
+    async def open(self):
+        if self.client is not None and self.client.is_connected:
+            return
+        # Как и SMTP-бэкенд Django, авторизуемся только при заданных логине и пароле:
+        # EMAIL_HOST_USER без пароля используется лишь как адрес отправителя
+        login = settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD
+        self.client = aiosmtplib.SMTP(
+            hostname=settings.EMAIL_HOST,
+            port=int(settings.EMAIL_PORT),
+            username=settings.EMAIL_HOST_USER if login else None,
+            password=settings.EMAIL_HOST_PASSWORD if login else None,
+            use_tls=settings.EMAIL_USE_SSL,
+            start_tls=settings.EMAIL_USE_TLS,
+            timeout=settings.EMAIL_TIMEOUT or 60,
+        )
+        await self.client.connect()
+        self.sent_in_batch = 0
+
+    async def close(self):
+        if self.client is not None and self.client.is_connected:
+            try:
+                await self.client.quit()
+            except aiosmtplib.SMTPException:
+                self.client.close()
+        self.client = None
+        self.sent_in_batch = 0
+
+    async def send(self, email):
+        """Отправляет письмо, при обрыве сессии переподключается и повторяет отправку один раз"""
+        if self.sent_in_batch >= self.batch_size:
+            await self.close()
+        await self.open()
+        try:
+            await self.sendmail(email)
+        except RECONNECT_ERRORS as e:
+            logging.warning(f"SMTP-соединение разорвано, переподключение: {e}")
+            await self.close()
+            await self.open()
+            await self.sendmail(email)
+        self.sent_in_batch += 1
+
+    async def sendmail(self, email):
+        await self.client.sendmail(
+            email.from_email,
+            email.recipients(),
+            email.message().as_bytes(linesep="\r\n"),
+        )
+
+
+class AsyncSenderPool:
+    """Пул из size одновременных SMTP-сессий внутри одного event loop"""
+
+    def __init__(self, size, batch_size=None, limiter=None):
+        self.size = size
+        self.limiter = limiter
+        self.senders = asyncio.Queue()
+        for _ in range(size):
+            self.senders.put_nowait(AsyncBatchSender(batch_size))
+
+    async def deliver(self, key, email):
+        try:
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            sender = await self.senders.get()
+            try:
+                await sender.send(email)
+            finally:
+                self.senders.put_nowait(sender)
+        except Exception as e:
+            logging.error(f"Ошибка отправки письма: {e}")
+            return key, e
+        return key, None
+
+    async def close(self):
+        while not self.senders.empty():
+            await self.senders.get_nowait().close()
+
+
+def send_async(jobs, workers=None, batch_size=None, limiter=None):
+    """Отправляет письма через asyncio: workers одновременных SMTP-сессий в одном потоке.
+
+    В отправке держится до workers * 4 писем: результат каждого отдается, как только
+    оно отправлено, а на его место сразу берется следующее задание, так что медленная
+    сессия не задерживает остальные. Генератор jobs (и запросы к БД в нем) выполняется
+    между шагами event loop, в потоке и соединении с БД вызывающего.
+    """
+    workers = workers or settings.MAILING_ASYNC_SESSIONS
+    loop = asyncio.new_event_loop()
+    pool = AsyncSenderPool(workers, batch_size, limiter)
+    jobs = iter(jobs)
+    pending = set()
+    try:
+        while True:
+            for key, email in islice(jobs, workers * 4 - len(pending)):
+                pending.add(loop.create_task(pool.deliver(key, email)))
+            if not pending:
+                break
+            done, pending = loop.run_until_complete(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.run_until_complete(pool.close())
+        loop.close()
@@ -0,0 +1,55 @@
+from utils.cache import bump_version, get_versions
+
+MAILING_LIST_KEY = "mailing_list"
+MESSAGE_LIST_KEY = "message_list"
+RECIPIENT_LIST_KEY = "recipient_list"
+
+# Какие закэшированные списки устаревают при изменении модели (по имени модели)
+INVALIDATED_KEYS = {
+    "mailing": (MAILING_LIST_KEY,),
+    "message": (MESSAGE_LIST_KEY, MAILING_LIST_KEY),
+    "recipient": (RECIPIENT_LIST_KEY, MAILING_LIST_KEY),
+}
+
+
+def list_version_key(key):
+    return f"version:{key}"
+
+
+def list_key(key):
+    """Ключ общего списка с текущей версией.
+
+    Списки не удаляются, а получают новую версию. Версия читается из Redis
+    при каждом обращении (один GET), поэтому изменение сразу видно всем
+    процессам; в LocalCache хранятся только значения под версионированными ключами.
+    """
+    (version,) = get_versions(list_version_key(key))
+    return f"{key}:v{version}"
+
+
+def owner_version_key(owner_id):
+    return f"owner_version:{owner_id}"
+
+
+def owner_key(key, owner_id):
+    """Ключ списка владельца с текущими версиями списка и данных владельца.
+
+    Обе версии читаются из Redis одним get_many.
+    """
+    list_version, owner_version = get_versions(
+        list_version_key(key), owner_version_key(owner_id)
+    )
+    return f"{key}:owner:{owner_id}:v{list_version}.{owner_version}"
+
+
+def invalidate_model_cache(model, owner_ids=()):
+    """Сбрасывает закэшированные списки, которые зависят от модели.
+
+    Увеличиваются версии общих списков и версии владельцев owner_ids, так что
+    прежние значения перестают читаться из кэша. Вызывается сигналами, а также после
+    массовых update() и bulk_create(), которые сигналов не отправляют.
+    """
+    for key in INVALIDATED_KEYS[model._meta.model_name]:
+        bump_version(list_version_key(key))
+    for owner_id in set(owner_ids) - {None}:
+        bump_version(owner_version_key(owner_id))
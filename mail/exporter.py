@@ -0,0 +1,84 @@
+import csv
+import json
+import zlib
+from itertools import islice
+
+from django.conf import settings
+
+from mail.models import MailingAttempt, Recipient
+
+# Набор колонок и запрос для каждой выгрузки
+EXPORTS = {
+    "recipients": (
+        Recipient.objects.order_by("pk"),
+        ("id", "email", "full_name", "comment", "owner_id"),
+    ),
+    "attempts": (
+        MailingAttempt.objects.order_by("pk"),
+        (
+            "id",
+            "mailing_id",
+            "recipient_id",
+            "recipient__email",
+            "status",
+            "server_response",
+            "attempt_datetime",
+        ),
+    ),
+}
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, fields):
+    """Читает строки выгрузки потоком через серверный курсор"""
+    return queryset.values_list(*fields).iterator(
+        chunk_size=settings.MAILING_ITERATOR_CHUNK_SIZE
+    )
+
+
+def render_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def render_jsonl(rows, fields):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), ensure_ascii=False, default=str) + "\n"
+
+
+RENDERERS = {"csv": render_csv, "jsonl": render_jsonl}
+
+
+def export(name, format="csv", compress=False, queryset=None):
+    """Выгрузка name в формате format как поток байтов (с gzip при compress=True).
+
+    Строки склеиваются в блоки, чтобы не отдавать клиенту по одной строке; в памяти
+    одновременно находится только один блок.
+    """
+    default_queryset, fields = EXPORTS[name]
+    rows = export_rows(queryset if queryset is not None else default_queryset, fields)
+    lines = RENDERERS[format](rows, fields)
+    blocks = (
+        "".join(block).encode()
+        for block in iter(
+            lambda: list(islice(lines, settings.MAILING_ITERATOR_CHUNK_SIZE)), []
+        )
+    )
+    return gzip_stream(blocks) if compress else blocks
+
+
+def gzip_stream(blocks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for block in blocks:
+        if data := compressor.compress(block):
+            yield data
+    yield compressor.flush()
@@ -9,10 +9,29 @@ class RecipientForm(forms.ModelForm):
         fields = ["email", "full_name", "comment"]
 
 
+class RecipientImportForm(forms.Form):
+    file = forms.FileField(
+        label="CSV-файл",
+        help_text="Колонки: email, full_name, comment (строка заголовка необязательна)",
+    )
+    mailing = forms.ModelChoiceField(
+        queryset=Mailing.objects.none(),
+        required=False,
+        label="Добавить в рассылку",
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["mailing"].queryset = Mailing.objects.filter(owner=user)
+
+
 class MessageForm(forms.ModelForm):
     class Meta:
         model = Message
         fields = ["subject", "body"]
+        help_texts = {
+            "body": "Можно подставить данные получателя: {{ full_name }}, {{ email }}, {{ comment }}",
+        }
 
     def clean(self):
         cleaned_data = super().clean()
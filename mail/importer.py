@@ -0,0 +1,131 @@
+import csv
+import logging
+import time
+from itertools import chain, islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from mail.cache_keys import invalidate_model_cache
+from mail.models import Mailing, Recipient
+
+IMPORT_FIELDS = ("email", "full_name", "comment")
+FULL_NAME_MAX_LENGTH = Recipient._meta.get_field("full_name").max_length
+
+
+class ImportResult:
+    """Итоги импорта получателей из CSV"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.invalid = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return (
+            f"Строк: {self.rows}, новых получателей: {self.created}, "
+            f"с ошибками: {self.invalid}, за {self.elapsed:.2f} с "
+            f"({self.rate:.0f} строк/с)"
+        )
+
+
+def normalize_email(email):
+    """Приводит домен адреса к нижнему регистру, локальную часть оставляет как есть"""
+    local, _, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+def normalize_row(row):
+    """Проверяет и нормализует строку CSV, возвращает (email, full_name, comment)"""
+    values = [value.strip() for value in row] + [""] * len(IMPORT_FIELDS)
+    email, full_name, comment = values[: len(IMPORT_FIELDS)]
+    email = normalize_email(email)
+    validate_email(email)
+    return email, full_name[:FULL_NAME_MAX_LENGTH], comment
+
+
+def import_recipients(lines, owner=None, mailing=None, batch_size=None):
+    """Импортирует получателей из строк CSV (email, full_name, comment) порциями.
+
+    Файл читается потоком: в памяти одновременно только batch_size строк. Уже
+    существующие email пропускаются, все строки файла (и новые, и существующие)
+    при переданной mailing добавляются в ее получателей.
+    """
+    batch_size = batch_size or settings.MAILING_IMPORT_BATCH_SIZE
+    result = ImportResult()
+    reader = csv.reader(lines)
+    rows = (row for row in reader if any(value.strip() for value in row))
+    first = next(rows, None)
+    if first is not None and first[0].strip().lower() != "email":
+        rows = chain([first], rows)
+
+    while chunk := list(islice(rows, batch_size)):
+        valid = {}
+        for row in chunk:
+            result.rows += 1
+            try:
+                email, full_name, comment = normalize_row(row)
+            except ValidationError:
+                result.invalid += 1
+                if len(result.errors) < 10:
+                    result.errors.append(f"{row[0]!r}: некорректный email")
+                continue
+            valid[email] = (full_name, comment)
+        if valid:
+            result.created += save_chunk(valid, owner, mailing)
+    owner_ids = [owner.pk] if owner is not None else []
+    if mailing is not None:
+        owner_ids.append(mailing.owner_id)
+        Mailing.objects.filter(pk=mailing.pk).update(updated_at=timezone.now())
+    invalidate_model_cache(Recipient, owner_ids)
+
+    result.elapsed = time.perf_counter() - result.started
+    logging.info(f"Импорт получателей: {result}")
+    return result
+
+
+def save_chunk(rows, owner, mailing):
+    """Сохраняет порцию строк несколькими запросами, возвращает число новых получателей.
+
+    Существующие получатели ищутся без учета регистра домена: адрес, ранее
+    сохраненный как user@Example.com, не создается заново как user@example.com.
+    """
+    existing = {}
+    for pk, email in (
+        Recipient.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[email.lower() for email in rows])
+        .values_list("pk", "email")
+    ):
+        existing.setdefault(normalize_email(email), pk)
+    new = [
+        Recipient(email=email, full_name=full_name, comment=comment, owner=owner)
+        for email, (full_name, comment) in rows.items()
+        if email not in existing
+    ]
+    Recipient.objects.bulk_create(new, ignore_conflicts=True)
+    if mailing is not None:
+        recipient_ids = chain(
+            existing.values(),
+            Recipient.objects.filter(
+                email__in=[recipient.email for recipient in new]
+            ).values_list("pk", flat=True),
+        )
+        through = Mailing.recipients.through
+        through.objects.bulk_create(
+            (
+                through(mailing=mailing, recipient_id=recipient_id)
+                for recipient_id in recipient_ids
+            ),
+            ignore_conflicts=True,
+        )
+    return len(new)
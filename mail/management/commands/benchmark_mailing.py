@@ -0,0 +1,112 @@
+import resource
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from mail.models import Mailing, Message, Recipient
+from mail.sender import ENGINES, DeliveryStats
+from utils.smtp_sink import SMTPSink
+
+
+class QueryCounter:
+    """Обертка execute_wrapper, считающая запросы к БД"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет Mailing.send_mailing целиком: создает получателей, отправляет на "
+        "локальный SMTP-сервер и выводит писем/с, p50/p95 задержки, запросы к БД "
+        "на письмо и пиковый RSS. RSS — максимум процесса с начала запуска, поэтому "
+        "для сравнения движков по памяти запускайте каждый отдельно через --engine"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=1000)
+        parser.add_argument("--domains", type=int, default=5)
+        parser.add_argument("--engine", choices=ENGINES, action="append")
+        parser.add_argument(
+            "--latency", type=float, default=0, help="Задержка SMTP-сервера, с"
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Доля писем, отклоняемых сервером ошибкой 451",
+        )
+
+    def handle(self, *args, **options):
+        # Замер не должен зависеть от Redis: без кэша списков и лимитов скорости
+        with override_settings(
+            CACHE_ENABLED=False,
+            MAILING_RATE_LIMIT_RELAY=0,
+            MAILING_RATE_LIMIT_OWNER=0,
+            MAILING_DOMAIN_LIMITS={},
+        ):
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        message = Message.objects.create(
+            subject="Специальное предложение", body="Текст письма\n" * 40
+        )
+        recipients = Recipient.objects.bulk_create(
+            (
+                Recipient(
+                    email=f"bench-{run_id}-{i}@d{i % options['domains']}.example.com",
+                    full_name=f"Получатель {i}",
+                )
+                for i in range(options["recipients"])
+            ),
+            batch_size=1000,
+        )
+        try:
+            with SMTPSink(
+                latency=options["latency"], error_rate=options["error_rate"]
+            ) as sink, override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST=sink.host,
+                EMAIL_PORT=sink.port,
+                EMAIL_USE_SSL=False,
+                EMAIL_USE_TLS=False,
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                DEFAULT_FROM_EMAIL="bench@example.com",
+            ):
+                for engine in options["engine"] or ENGINES:
+                    self.run(engine, message, recipients)
+        finally:
+            message.delete()
+            Recipient.objects.filter(email__startswith=f"bench-{run_id}-").delete()
+
+    def run(self, engine, message, recipients):
+        mailing = Mailing.objects.create(message=message)
+        Mailing.recipients.through.objects.bulk_create(
+            (
+                Mailing.recipients.through(mailing=mailing, recipient=recipient)
+                for recipient in recipients
+            ),
+            batch_size=1000,
+        )
+        stats = DeliveryStats()
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            mailing.send_mailing(engine=engine, stats=stats)
+        count = len(stats.latencies)
+        # ru_maxrss — пик за все время процесса, включая предыдущие движки
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{engine}: {stats.summary()}, "
+                f"{queries.count / count if count else 0:.2f} запросов к БД на письмо, "
+                f"пиковый RSS процесса с начала запуска {peak_rss:.0f} МБ"
+            )
+        )
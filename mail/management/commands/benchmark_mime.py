@@ -0,0 +1,67 @@
+import time
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+
+from mail.mime import MessageTemplate
+from mail.models import Recipient
+
+SUBJECT = "Специальное предложение для наших клиентов"
+BODY = "Здравствуйте! Сообщаем о новых возможностях нашего сервиса рассылок.\n" * 40
+PERSONALIZED_SUBJECT = "{{ full_name }}, специальное предложение для вас"
+PERSONALIZED_BODY = "Здравствуйте, {{ full_name }}! {{ comment }}\n" + BODY
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает сборку MIME-письма на каждого получателя, общий MessageTemplate "
+        "и рендеринг персонализированных писем"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        recipients = [
+            Recipient(
+                email=f"r{i}@example.com",
+                full_name=f"Получатель {i}",
+                comment="Постоянный клиент",
+            )
+            for i in range(count)
+        ]
+
+        started = time.perf_counter()
+        for recipient in recipients:
+            EmailMessage(
+                SUBJECT, BODY, "bench@example.com", [recipient.email]
+            ).message().as_bytes(linesep="\r\n")
+        self.report("EmailMessage на каждого получателя", started, count)
+
+        started = time.perf_counter()
+        template = MessageTemplate(SUBJECT, BODY, "bench@example.com")
+        for recipient in recipients:
+            template.render(recipient).message().as_bytes(linesep="\r\n")
+        self.report("MessageTemplate", started, count)
+
+        template = MessageTemplate(
+            PERSONALIZED_SUBJECT, PERSONALIZED_BODY, "bench@example.com"
+        )
+        started = time.perf_counter()
+        for recipient in recipients:
+            template.subject.render(recipient)
+            template.body.render(recipient)
+        self.report("Рендеринг подстановок", started, count)
+
+        started = time.perf_counter()
+        for recipient in recipients:
+            template.render(recipient).message().as_bytes(linesep="\r\n")
+        self.report("Персонализированное письмо целиком", started, count)
+
+    def report(self, name, started, count):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{name}: {elapsed / count * 1e6:.1f} мкс/письмо, "
+            f"{elapsed / count * 100_000:.2f} с на 100 000 получателей"
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from mail.sender import ENGINES, send_emails
+from utils.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = "Замеряет скорость отправки писем (писем/с) на локальный SMTP-сервер"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=1000)
+        parser.add_argument("--engine", choices=ENGINES, action="append")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        with SMTPSink() as sink, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST=sink.host,
+            EMAIL_PORT=sink.port,
+            EMAIL_USE_SSL=False,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+        ):
+            for engine in options["engine"] or ENGINES:
+                kwargs = {"batch_size": options["batch_size"]}
+                if engine != "sequential":
+                    kwargs["workers"] = options["workers"]
+                jobs = (
+                    (
+                        i,
+                        EmailMessage(
+                            "Тема",
+                            "Текст письма",
+                            "bench@example.com",
+                            [f"r{i}@example.com"],
+                        ),
+                    )
+                    for i in range(options["messages"])
+                )
+                started = time.perf_counter()
+                failed = sum(
+                    error is not None
+                    for _, error in send_emails(jobs, engine, **kwargs)
+                )
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{engine}: {options['messages']} писем за {elapsed:.2f} с, "
+                        f"{options['messages'] / elapsed:.0f} писем/с, ошибок: {failed}"
+                    )
+                )
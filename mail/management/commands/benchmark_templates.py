@@ -0,0 +1,79 @@
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from mail.models import Mailing, MailingAttempt, Message, Recipient
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет рендеринг списков рассылок и попыток на N строк: без кэша фрагментов "
+        "(первый рендер) и с прогретым кэшем. Созданные данные откатываются"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, action="append")
+        parser.add_argument("--recipients", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for rows in options["rows"] or [1000, 10000]:
+            with transaction.atomic():
+                self.run(rows, options["recipients"])
+                transaction.set_rollback(True)
+
+    def run(self, rows, recipients_per_mailing):
+        owner = CustomUser.objects.create(
+            email="bench-templates@example.com", is_staff=True
+        )
+        message = Message.objects.create(
+            subject="Предложение", body="Текст письма " * 20, owner=owner
+        )
+        recipients = Recipient.objects.bulk_create(
+            Recipient(email=f"bench-{i}@example.com", full_name=f"Получатель {i}")
+            for i in range(recipients_per_mailing)
+        )
+        mailings = Mailing.objects.bulk_create(
+            Mailing(message=message, owner=owner) for _ in range(rows)
+        )
+        Mailing.recipients.through.objects.bulk_create(
+            Mailing.recipients.through(mailing=mailing, recipient=recipient)
+            for mailing in mailings
+            for recipient in recipients
+        )
+        MailingAttempt.objects.bulk_create(
+            MailingAttempt(mailing=mailing, status="Успешно", owner=owner)
+            for mailing in mailings
+        )
+
+        request = RequestFactory().get("/")
+        request.user = owner
+        mailing_list = list(
+            Mailing.objects.filter(owner=owner).with_recipient_preview()
+        )
+        attempt_list = list(
+            MailingAttempt.objects.filter(owner=owner)
+            .select_related("owner")
+            .prefetch_related(
+                Prefetch("mailing", queryset=Mailing.objects.with_recipient_preview())
+            )
+        )
+        for template, context in (
+            ("mail/mailing_list.html", {"mailing_list": mailing_list}),
+            ("mail/mailing_attempt_list.html", {"mailing_attempt_list": attempt_list}),
+        ):
+            caches["fragments"].clear()
+            timings = []
+            for _ in range(2):
+                started = time.perf_counter()
+                render_to_string(template, context, request)
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f"{template}, {rows} строк: без кэша {timings[0] * 1000:.0f} мс, "
+                f"с кэшем фрагментов {timings[1] * 1000:.0f} мс"
+            )
@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from mail.exporter import EXPORTS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = "Потоково выгружает получателей или попытки рассылок в CSV/JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=EXPORTS)
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Сжать выгрузку gzip")
+        parser.add_argument("--output", help="Файл выгрузки (по умолчанию stdout)")
+
+    def handle(self, *args, **options):
+        blocks = export(options["name"], options["format"], options["gzip"])
+        if options["output"] is None:
+            for block in blocks:
+                sys.stdout.buffer.write(block)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options["output"], "wb") as output:
+            for block in blocks:
+                output.write(block)
+        self.stderr.write(self.style.SUCCESS(f"Export saved to {options['output']}."))
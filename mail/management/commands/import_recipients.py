@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mail.importer import import_recipients
+from mail.models import Mailing
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Импортирует получателей из CSV-файла (email, full_name, comment)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--mailing", type=int, help="Добавить получателей в рассылку"
+        )
+        parser.add_argument("--owner", help="Email владельца получателей")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        owner = mailing = None
+        if options["owner"]:
+            owner = CustomUser.objects.filter(email=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"User {options['owner']} not found.")
+        if options["mailing"]:
+            mailing = Mailing.objects.filter(pk=options["mailing"]).first()
+            if mailing is None:
+                raise CommandError(f"Mailing with id {options['mailing']} not found.")
+
+        with open(options["path"], newline="", encoding="utf-8-sig") as lines:
+            result = import_recipients(
+                lines, owner=owner, mailing=mailing, batch_size=options["batch_size"]
+            )
+        for error in result.errors:
+            self.stderr.write(self.style.WARNING(error))
+        self.stdout.write(self.style.SUCCESS(str(result)))
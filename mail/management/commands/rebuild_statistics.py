@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from mail.models import MailingAttempt, UserMailingStatistics
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает статистику рассылок пользователей по попыткам отправки"
+
+    def handle(self, *args, **options):
+        rows = (
+            MailingAttempt.objects.filter(mailing__owner__isnull=False)
+            .values("mailing__owner")
+            .annotate(
+                successful=Count("id", filter=Q(status="Успешно")),
+                failed=Count("id", filter=Q(status="Не успешно")),
+            )
+            .order_by()
+        )
+        statistics = [
+            UserMailingStatistics(
+                user_id=row["mailing__owner"],
+                total_mailings=row["successful"] + row["failed"],
+                successful_mailings=row["successful"],
+                failed_mailings=row["failed"],
+            )
+            for row in rows
+        ]
+
+        with transaction.atomic():
+            UserMailingStatistics.objects.update(
+                total_mailings=0, successful_mailings=0, failed_mailings=0
+            )
+            UserMailingStatistics.objects.bulk_create(
+                statistics,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=[
+                    "total_mailings",
+                    "successful_mailings",
+                    "failed_mailings",
+                ],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Статистика пересчитана для {len(statistics)} пользователей."
+            )
+        )
@@ -1,31 +1,126 @@
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
 from mail.models import Mailing
+from mail.sender import ENGINES, DeliveryStats
 
 
 class Command(BaseCommand):
     help = "Начать рассылку"
 
     def add_arguments(self, parser):
-        parser.add_argument("mailing_id", type=int)
+        parser.add_argument("mailing_id", type=int, nargs="*")
+        parser.add_argument(
+            "--due",
+            action="store_true",
+            help="Запустить все рассылки, время первой отправки которых наступило",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Сколько рассылок отправлять одновременно",
+        )
+        parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            help="Движок отправки (по умолчанию settings.MAILING_ENGINE)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Продолжить прерванную рассылку только для неотправленных получателей",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только посчитать получателей, ничего не отправляя",
+        )
 
     def handle(self, *args, **options):
-        mailing_id = options["mailing_id"]
-        try:
-            mailing = Mailing.objects.get(pk=mailing_id)
-        except Mailing.DoesNotExist:
-            self.stderr.write(
-                self.style.ERROR(f"Mailing with id {mailing_id} not found.")
-            )
+        mailings = self.get_mailings(options)
+        if not mailings:
+            self.stdout.write("No mailings to start.")
             return
 
-        if mailing.status != "Создана":
-            self.stderr.write(
-                self.style.ERROR(
-                    f'Mailing with id {mailing_id} is not in "Создана" status.'
+        if options["dry_run"]:
+            for mailing in mailings:
+                pending = mailing.pending_recipients().count()
+                self.stdout.write(
+                    f"Mailing with id {mailing.pk} would send {pending} messages."
                 )
-            )
             return
 
-        mailing.send_mailing()
-        self.stdout.write(self.style.SUCCESS(f"Mailing with id {mailing_id} started."))
+        stats = DeliveryStats()
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            futures = {
+                pool.submit(self.send_mailing, mailing, stats, options): mailing
+                for mailing in mailings
+            }
+        for future, mailing in futures.items():
+            try:
+                sent = future.result()
+            except Exception as e:
+                self.stderr.write(
+                    self.style.ERROR(f"Mailing with id {mailing.pk} failed: {e}")
+                )
+                continue
+            if not sent:
+                reason = (
+                    "is blocked"
+                    if mailing.is_blocked
+                    else "was started or finished by another worker"
+                )
+                self.stderr.write(
+                    self.style.ERROR(f"Mailing with id {mailing.pk} skipped: {reason}.")
+                )
+                continue
+            action = "resumed" if options["resume"] else "started"
+            self.stdout.write(
+                self.style.SUCCESS(f"Mailing with id {mailing.pk} {action}.")
+            )
+        self.stdout.write(stats.summary())
+
+    def get_mailings(self, options):
+        if options["due"]:
+            if options["resume"]:
+                raise CommandError("--resume cannot be combined with --due.")
+            return list(Mailing.objects.due().select_related("message", "owner"))
+        if not options["mailing_id"]:
+            raise CommandError("Pass mailing ids or --due.")
+
+        expected_status = "Запущена" if options["resume"] else "Создана"
+        found = Mailing.objects.select_related("message", "owner").in_bulk(
+            options["mailing_id"]
+        )
+        mailings = []
+        for mailing_id in options["mailing_id"]:
+            mailing = found.get(mailing_id)
+            if mailing is None:
+                self.stderr.write(
+                    self.style.ERROR(f"Mailing with id {mailing_id} not found.")
+                )
+            elif mailing.is_blocked:
+                self.stderr.write(
+                    self.style.ERROR(f"Mailing with id {mailing_id} is blocked.")
+                )
+            elif mailing.status != expected_status:
+                self.stderr.write(
+                    self.style.ERROR(
+                        f'Mailing with id {mailing_id} is not in "{expected_status}" status.'
+                    )
+                )
+            else:
+                mailings.append(mailing)
+        return mailings
+
+    def send_mailing(self, mailing, stats, options):
+        """Отправляет одну рассылку в потоке пула, возвращает False, если она пропущена"""
+        try:
+            return mailing.send_mailing(
+                engine=options["engine"], resume=options["resume"], stats=stats
+            )
+        finally:
+            connections.close_all()
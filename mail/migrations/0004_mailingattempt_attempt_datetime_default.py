@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0003_mailing_owner_message_owner_recipient_owner_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mailingattempt",
+            name="attempt_datetime",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0004_mailingattempt_attempt_datetime_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mailing",
+            index=models.Index(
+                condition=models.Q(("is_blocked", False), ("status", "Создана")),
+                fields=["first_send_time"],
+                name="mailing_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailing",
+            index=models.Index(
+                condition=models.Q(("status", "Запущена")),
+                fields=["end_time"],
+                name="mailing_running_end_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0005_mailing_due_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadLetter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254)),
+                ("code", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "mailing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="mail.mailing"
+                    ),
+                ),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="mail.recipient",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Недоставленное письмо",
+                "verbose_name_plural": "Недоставленные письма",
+            },
+        ),
+        migrations.CreateModel(
+            name="DeliveryRetry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=1)),
+                ("next_attempt_at", models.DateTimeField()),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "mailing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="mail.mailing"
+                    ),
+                ),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="mail.recipient"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Повторная отправка",
+                "verbose_name_plural": "Повторные отправки",
+                "indexes": [
+                    models.Index(
+                        fields=["next_attempt_at"], name="delivery_retry_due_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("mailing", "recipient"), name="unique_delivery_retry"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0006_deliveryretry_deadletter"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="deliveryretry",
+            name="unique_delivery_retry",
+        ),
+        migrations.RemoveIndex(
+            model_name="deliveryretry",
+            name="delivery_retry_due_idx",
+        ),
+        migrations.RenameModel(
+            old_name="DeliveryRetry",
+            new_name="MailingDelivery",
+        ),
+        migrations.AlterModelOptions(
+            name="mailingdelivery",
+            options={
+                "verbose_name": "Доставка получателю",
+                "verbose_name_plural": "Доставки получателям",
+            },
+        ),
+        migrations.AddField(
+            model_name="mailingdelivery",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("Отправлено", "Отправлено"),
+                    ("Повтор", "Повтор"),
+                    ("Не доставлено", "Не доставлено"),
+                ],
+                default="Повтор",
+                max_length=15,
+            ),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="mailingdelivery",
+            name="next_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="mailingdelivery",
+            constraint=models.UniqueConstraint(
+                fields=("mailing", "recipient"), name="unique_mailing_delivery"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailingdelivery",
+            index=models.Index(
+                condition=models.Q(("status", "Повтор")),
+                fields=["next_attempt_at"],
+                name="mailing_delivery_retry_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="mailingattempt",
+            name="recipient",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="mail.recipient",
+                verbose_name="Получатель",
+            ),
+        ),
+    ]
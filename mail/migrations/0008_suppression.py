@@ -0,0 +1,57 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0007_mailingdelivery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Suppression",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.EmailField(max_length=254, unique=True)),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("Отказ", "Отказ"),
+                            ("Отписка", "Отписка"),
+                            ("Жалоба", "Жалоба"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Исключенный адрес",
+                "verbose_name_plural": "Исключенные адреса",
+            },
+        ),
+        migrations.AlterField(
+            model_name="mailingdelivery",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("Отправлено", "Отправлено"),
+                    ("Повтор", "Повтор"),
+                    ("Не доставлено", "Не доставлено"),
+                    ("Исключено", "Исключено"),
+                ],
+                max_length=15,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0008_suppression"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailing",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
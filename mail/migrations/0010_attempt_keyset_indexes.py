@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0009_mailing_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mailingattempt",
+            index=models.Index(
+                fields=["-attempt_datetime", "-id"], name="attempt_keyset_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailingattempt",
+            index=models.Index(
+                fields=["mailing", "-attempt_datetime", "-id"],
+                name="attempt_mailing_keyset_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailingattempt",
+            index=models.Index(
+                fields=["status", "-attempt_datetime", "-id"],
+                name="attempt_status_keyset_idx",
+            ),
+        ),
+    ]
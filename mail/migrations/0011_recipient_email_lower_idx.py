@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:53
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0010_attempt_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipient",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="recipient_email_lower_idx",
+            ),
+        ),
+    ]
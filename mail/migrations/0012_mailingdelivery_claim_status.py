@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mail", "0011_recipient_email_lower_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mailingdelivery",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("Отправка", "Отправка"),
+                    ("Отправлено", "Отправлено"),
+                    ("Повтор", "Повтор"),
+                    ("Не доставлено", "Не доставлено"),
+                    ("Исключено", "Исключено"),
+                ],
+                max_length=15,
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+import re
+from email.utils import formatdate, make_msgid
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.message import sanitize_address
+from django.core.mail.utils import DNS_NAME
+
+# Заголовки, которые меняются от письма к письму и подставляются при каждой отправке
+PER_MESSAGE_HEADERS = ("To", "Date", "Message-ID")
+
+# Поля получателя, доступные в теме и тексте письма как {{ full_name }} и т.п.
+PLACEHOLDER_FIELDS = ("full_name", "email", "comment")
+PLACEHOLDER = re.compile(r"{{\s*(%s)\s*}}" % "|".join(PLACEHOLDER_FIELDS))
+
+
+class CompiledText:
+    """Текст с подстановками {{ поле }}, один раз скомпилированный в строку формата.
+
+    Рендеринг для получателя — один вызов str.format без разбора шаблона.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        parts = PLACEHOLDER.split(text)
+        self.fields = set(parts[1::2])
+        self.format = "".join(
+            "{0.%s}" % part if i % 2 else part.replace("{", "{{").replace("}", "}}")
+            for i, part in enumerate(parts)
+        )
+
+    def render(self, recipient):
+        if not self.fields:
+            return self.text
+        return self.format.format(recipient)
+
+
+class RawMessage:
+    """Готовое MIME-сообщение в байтах с интерфейсом, которого достаточно почтовым бэкендам"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def as_bytes(self, unixfrom=False, linesep="\n"):
+        if linesep == "\r\n":
+            return self.data
+        return self.data.replace(b"\r\n", linesep.encode())
+
+    def get_charset(self):
+        return None
+
+
+class MessageTemplate:
+    """Письмо рассылки, подготовленное один раз на всю рассылку.
+
+    Если в теме и тексте нет подстановок, письмо сразу кодируется в MIME (в том числе
+    кириллица в заголовках и base64/quoted-printable в теле), а для каждого получателя
+    подставляются только заголовки To, Date и Message-ID. Иначе тема и текст
+    рендерятся для получателя из заранее скомпилированных CompiledText.
+    """
+
+    def __init__(self, subject, body, from_email):
+        self.subject = CompiledText(subject)
+        self.body = CompiledText(body)
+        self.from_email = from_email
+        self.encoding = settings.DEFAULT_CHARSET
+        self.recipient_fields = {"email"} | self.subject.fields | self.body.fields
+        self.is_personalized = bool(self.subject.fields or self.body.fields)
+        if self.is_personalized:
+            return
+
+        message = EmailMessage(subject, body, from_email).message()
+        for header in PER_MESSAGE_HEADERS:
+            del message[header]
+        self.head, self.payload = message.as_bytes(linesep="\r\n").split(b"\r\n\r\n", 1)
+
+    def render(self, recipient):
+        """Собирает письмо получателю (объекту с полями email, full_name, comment)"""
+        if self.is_personalized:
+            return EmailMessage(
+                self.subject.render(recipient),
+                self.body.render(recipient),
+                self.from_email,
+                [recipient.email],
+            )
+        return PreparedEmail(self, recipient.email)
+
+    def serialize(self, to):
+        headers = "To: %s\r\nDate: %s\r\nMessage-ID: %s\r\n" % (
+            sanitize_address(to, self.encoding),
+            formatdate(localtime=settings.EMAIL_USE_LOCALTIME),
+            make_msgid(domain=DNS_NAME),
+        )
+        return b"%s\r\n%s\r\n%s" % (self.head, headers.encode(), self.payload)
+
+
+class PreparedEmail(EmailMessage):
+    """Письмо одному получателю на основе неперсонализированного MessageTemplate"""
+
+    def __init__(self, template, to):
+        super().__init__(
+            template.subject.text, template.body.text, template.from_email, [to]
+        )
+        self.template = template
+
+    def message(self):
+        return RawMessage(self.template.serialize(self.to[0]))
@@ -1,13 +1,38 @@
 import logging
-
-from django.core.mail import BadHeaderError, send_mail
-from django.db import models
+import threading
+import time
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import (Count, Exists, F, Max, Min, OuterRef, Prefetch,
+                              Q, Value)
+from django.db.models.functions import Lower, StrIndex, Substr
 from django.utils import timezone
+from django.utils.functional import cached_property
 
-from config import settings
+from mail.cache_keys import invalidate_model_cache
+from mail.mime import MessageTemplate
+from mail.ratelimit import get_rate_limiter
+from mail.sender import classify_error, retry_delay, send_emails
 from users.models import CustomUser
 
 
+def email_domain(field):
+    """Домен адреса из поля field в нижнем регистре, вычисляемый на стороне БД"""
+    return Lower(Substr(field, StrIndex(field, Value("@")) + 1))
+
+
+EMAIL_DOMAIN = email_domain("email")
+
+# Сколько получателей рассылки показывать в списках
+RECIPIENT_PREVIEW_SIZE = 5
+
+# Ответы SMTP о несуществующем ящике, после которых адрес попадает в Suppression
+HARD_BOUNCE_CODES = {550, 551, 553}
+
+
 class Recipient(models.Model):
     email = models.EmailField(unique=True)
     full_name = models.CharField(max_length=100)
@@ -30,6 +55,46 @@ class Recipient(models.Model):
         permissions = [
             ("can_view_all_recipients", "can view all recipients"),
         ]
+        # Поиск уже существующих адресов без учета регистра при импорте
+        indexes = [models.Index(Lower("email"), name="recipient_email_lower_idx")]
+
+
+class Suppression(models.Model):
+    REASON_CHOICES = [
+        ("Отказ", "Отказ"),
+        ("Отписка", "Отписка"),
+        ("Жалоба", "Жалоба"),
+    ]
+
+    email = models.EmailField(unique=True)
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.email} ({self.reason})"
+
+    def save(self, *args, **kwargs):
+        self.email = self.email.lower()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def emails_for(cls, recipients):
+        """Множество исключенных адресов среди recipients, загружаемое одним запросом.
+
+        Адреса хранятся в нижнем регистре; проверка получателя — поиск
+        recipient.email.lower() в множестве, без запросов к БД.
+        """
+        return set(
+            cls.objects.filter(
+                email__in=recipients.annotate(email_lower=Lower("email")).values(
+                    "email_lower"
+                )
+            ).values_list("email", flat=True)
+        )
+
+    class Meta:
+        verbose_name = "Исключенный адрес"
+        verbose_name_plural = "Исключенные адреса"
 
 
 class Message(models.Model):
@@ -55,6 +120,35 @@ class Message(models.Model):
         ]
 
 
+class MailingQuerySet(models.QuerySet):
+    def due(self, now=None):
+        """Незаблокированные созданные рассылки, время первой отправки которых наступило"""
+        now = now or timezone.now()
+        return (
+            self.filter(status="Создана", is_blocked=False, first_send_time__lte=now)
+            .filter(models.Q(end_time__isnull=True) | models.Q(end_time__gt=now))
+            .order_by("first_send_time")
+        )
+
+    def with_recipient_preview(self):
+        """Рассылки для списков: с сообщением, владельцем, числом получателей
+        и первыми RECIPIENT_PREVIEW_SIZE из них в recipient_preview.
+
+        Загружаются за постоянное число запросов независимо от числа рассылок.
+        """
+        return (
+            self.select_related("message", "owner")
+            .annotate(recipient_count=Count("recipients"))
+            .prefetch_related(
+                Prefetch(
+                    "recipients",
+                    queryset=Recipient.objects.order_by("pk")[:RECIPIENT_PREVIEW_SIZE],
+                    to_attr="recipient_preview",
+                )
+            )
+        )
+
+
 class Mailing(models.Model):
     STATUS_CHOICES = [
         ("Создана", "Создана"),
@@ -79,74 +173,288 @@ class Mailing(models.Model):
         on_delete=models.SET_NULL,
     )
     is_blocked = models.BooleanField(default=False)
+    # Меняется и при изменении сообщения или получателей рассылки (mail/signals.py),
+    # используется как версия закэшированной строки рассылки в шаблонах
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = MailingQuerySet.as_manager()
 
     def __str__(self):
         return f"Рассылка {self.pk} - {self.status}"
 
-    def send_mailing(self):
-        """Отправка сообщений всем получателям и логирование попыток отправки"""
-        user_stats, created = UserMailingStatistics.objects.get_or_create(
-            user=self.owner
+    @cached_property
+    def message_template(self):
+        """MIME-шаблон письма, общий для всех получателей рассылки"""
+        return MessageTemplate(
+            subject=self.message.subject,
+            body=self.message.body,
+            from_email=settings.EMAIL_HOST_USER,
         )
+
+    def build_email(self, recipient):
+        """Собирает письмо рассылки для одного получателя"""
+        return self.message_template.render(recipient)
+
+    def start(self):
+        """Переводит рассылку в статус «Запущена», если ее можно запустить"""
         if self.is_blocked:
             logging.info(f"Рассылка {self.pk} заблокирована.")
-            return
+            return False
 
         if self.status != "Создана":
             logging.info(f"Начало выполнения задачи: {self.status}")
-            return
-
-        if self.status != "Запущена":
+            return False
+
+        # Условный UPDATE не дает двум воркерам запустить одну рассылку дважды
+        started = Mailing.objects.filter(
+            pk=self.pk, status="Создана", is_blocked=False
+        ).update(status="Запущена", updated_at=timezone.now())
+        if started:
+            invalidate_model_cache(Mailing, [self.owner_id])
             self.status = "Запущена"
             self.start_datetime = timezone.now()
-            self.save()
-
-            recipients = self.recipients.all()
-            success_count = 0
-            for recipient in recipients:
-                logging.info(f"Начало выполнения задачи: {recipient.email}")
-                try:
-                    send_mail(
-                        subject=self.message.subject,
-                        message=self.message.body,
-                        from_email=settings.EMAIL_HOST_USER,
-                        recipient_list=[recipient.email],
-                        fail_silently=False,
+        return bool(started)
+
+    def is_expired(self):
+        """Проверяет, прошло ли время окончания рассылки"""
+        return self.end_time is not None and timezone.now() >= self.end_time
+
+    def build_jobs(self, recipients):
+        """Готовит письма получателям, прекращая отправку после end_time"""
+        for recipient in recipients:
+            if self.is_expired():
+                logging.info(
+                    f"Рассылка {self.pk} остановлена: истекло время окончания."
+                )
+                return
+            yield recipient, self.build_email(recipient)
+
+    def claim(self, jobs):
+        """Перед отправкой отмечает получателей порции статусом «Отправка».
+
+        Отмеченные получатели не входят в pending_recipients, поэтому после падения
+        воркера (в том числе по SIGKILL, когда AttemptBuffer не успевает записать
+        итоги) resume не отправит им письмо повторно. Цена — письма порции, отмеченные,
+        но не отправленные до падения (не больше MAILING_CLAIM_BATCH_SIZE): они
+        остаются в статусе «Отправка» и автоматически не отправляются.
+        """
+        jobs = iter(jobs)
+        while batch := list(islice(jobs, settings.MAILING_CLAIM_BATCH_SIZE)):
+            MailingDelivery.objects.bulk_create(
+                (
+                    MailingDelivery(
+                        mailing=self, recipient=recipient, status="Отправка"
                     )
+                    for recipient, email in batch
+                ),
+                update_conflicts=True,
+                unique_fields=["mailing", "recipient"],
+                update_fields=["status"],
+            )
+            yield from batch
+
+    def pending_recipients(self):
+        """Получатели, по которым еще нет отметки о доставке, недоставке или повторе"""
+        return self.recipients.exclude(
+            Exists(
+                MailingDelivery.objects.filter(mailing=self, recipient=OuterRef("pk"))
+            )
+        )
 
-                    MailingAttempt.objects.create(
-                        mailing=self,
-                        status="Успешно",
-                        server_response="Письмо отправлено успешно.",
-                        attempt_datetime=timezone.now(),
-                    )
-
-                    success_count += 1
-                    user_stats.update_statistics(success=True)
-
-                except BadHeaderError as e:
-                    logging.error(f"Ошибка отправки письма: {e}")
-                    MailingAttempt.objects.create(
-                        mailing=self,
-                        status="Не успешно",
-                        server_response=str(e),
-                        attempt_datetime=timezone.now(),
-                    )
-                    user_stats.update_statistics(success=False)
-
-                except Exception as e:
-                    logging.error(f"Ошибка отправки письма: {e}")
-                    MailingAttempt.objects.create(
-                        mailing=self,
-                        status="Не успешно",
-                        server_response=str(e),
-                        attempt_datetime=timezone.now(),
+    def deliver(self, recipients, engine=None, deliveries=None, stats=None):
+        """Отправляет письма переданным получателям и логирует попытки, возвращает число успешных.
+
+        Письма на домены без настроек в MAILING_DOMAIN_LIMITS отправляются одним
+        запуском движка с общим пулом соединений, подряд по доменам; каждый домен из
+        MAILING_DOMAIN_LIMITS отправляется отдельно со своими параллелизмом и лимитом
+        скорости. Число писем и скорость по каждому домену пишутся в лог.
+        deliveries — словарь {id получателя: MailingDelivery} для повторной отправки,
+        stats — DeliveryStats для замера пропускной способности и задержек.
+        """
+        deliveries = deliveries or {}
+        success_count = 0
+        total_count = 0
+        suppressed = Suppression.emails_for(recipients)
+        # Получатели читаются потоком (серверный курсор) и только колонками из шаблона,
+        # чтобы память не росла с размером рассылки
+        recipients = (
+            recipients.annotate(domain=EMAIL_DOMAIN)
+            .order_by("domain", "pk")
+            .only(*self.message_template.recipient_fields)
+        )
+        domain_limits = settings.MAILING_DOMAIN_LIMITS
+        groups = [(None, recipients.exclude(domain__in=list(domain_limits)))] + [
+            (domain, recipients.filter(domain=domain)) for domain in domain_limits
+        ]
+        with AttemptBuffer(self) as attempts:
+            for domain, group in groups:
+                if self.is_expired():
+                    break
+                throughput = DomainThroughput(self)
+                send = partial(
+                    send_emails,
+                    engine=engine,
+                    limiter=get_rate_limiter(self.owner, domain),
+                    workers=domain_limits.get(domain, {}).get("workers"),
+                )
+                group = group.iterator(chunk_size=settings.MAILING_ITERATOR_CHUNK_SIZE)
+                jobs = throughput.track(
+                    self.claim(
+                        self.build_jobs(
+                            self.skip_suppressed(group, suppressed, attempts)
+                        )
                     )
-                    user_stats.update_statistics(success=False)
-
-            if success_count == len(recipients):
-                self.status = "Завершена"
-            self.save()
+                )
+                results = send(jobs) if stats is None else stats.measure(jobs, send)
+                for recipient, error in results:
+                    logging.info(f"Начало выполнения задачи: {recipient.email}")
+                    total_count += 1
+                    delivery = deliveries.get(recipient.pk)
+                    success = self.record_result(attempts, recipient, error, delivery)
+                    success_count += success
+                    throughput.add(recipient.domain, success)
+        logging.info(f"Рассылка {self.pk}: успешно {success_count} из {total_count}")
+        return success_count
+
+    def skip_suppressed(self, recipients, suppressed, attempts):
+        """Пропускает получателей из списка исключений, отмечая их в буфере доставок"""
+        skipped = 0
+        for recipient in recipients:
+            if recipient.email.lower() not in suppressed:
+                yield recipient
+                continue
+            skipped += 1
+            attempts.checkpoint(
+                MailingDelivery(
+                    mailing=self,
+                    recipient=recipient,
+                    status="Исключено",
+                    next_attempt_at=None,
+                    last_error="Адрес в списке исключений",
+                )
+            )
+        if skipped:
+            logging.info(f"Рассылка {self.pk}: пропущено исключенных адресов {skipped}")
+
+    def record_result(self, attempts, recipient, error, delivery=None):
+        """Сохраняет в буфер итог отправки одному получателю, возвращает True при успехе.
+
+        Итог сохраняется в MailingDelivery как контрольная точка; временные ошибки
+        откладываются на повтор, постоянные попадают в DeadLetter.
+        """
+        attempt_number = delivery.attempts + 1 if delivery is not None else 1
+        if error is None:
+            attempts.add(
+                MailingAttempt(
+                    mailing=self,
+                    recipient=recipient,
+                    status="Успешно",
+                    server_response="Письмо отправлено успешно.",
+                    attempt_datetime=timezone.now(),
+                )
+            )
+            attempts.checkpoint(
+                MailingDelivery(
+                    mailing=self,
+                    recipient=recipient,
+                    status="Отправлено",
+                    attempts=attempt_number,
+                )
+            )
+            return True
+
+        attempts.add(
+            MailingAttempt(
+                mailing=self,
+                recipient=recipient,
+                status="Не успешно",
+                server_response=str(error),
+                attempt_datetime=timezone.now(),
+            )
+        )
+        code, transient = classify_error(error)
+        if transient and attempt_number < settings.MAILING_RETRY_MAX_ATTEMPTS:
+            attempts.checkpoint(
+                MailingDelivery(
+                    mailing=self,
+                    recipient=recipient,
+                    status="Повтор",
+                    attempts=attempt_number,
+                    next_attempt_at=timezone.now() + retry_delay(attempt_number),
+                    last_error=str(error),
+                )
+            )
+        else:
+            attempts.checkpoint(
+                MailingDelivery(
+                    mailing=self,
+                    recipient=recipient,
+                    status="Не доставлено",
+                    attempts=attempt_number,
+                    last_error=str(error),
+                )
+            )
+            attempts.dead_letter(
+                DeadLetter(
+                    mailing=self,
+                    recipient=recipient,
+                    email=recipient.email,
+                    code=code,
+                    error=str(error),
+                )
+            )
+        return False
+
+    def finish(self):
+        """Завершает рассылку, если не осталось писем, ожидающих повторной отправки"""
+        if self.mailingdelivery_set.filter(status="Повтор").exists():
+            return False
+        if Mailing.objects.filter(pk=self.pk, status="Запущена").update(
+            status="Завершена", updated_at=timezone.now()
+        ):
+            invalidate_model_cache(Mailing, [self.owner_id])
+        self.status = "Завершена"
+        return True
+
+    def abandon_retries(self):
+        """Переносит все отложенные повторы рассылки в недоставленные письма"""
+        retries = self.mailingdelivery_set.filter(status="Повтор").select_related(
+            "recipient"
+        )
+        DeadLetter.objects.bulk_create(
+            DeadLetter(
+                mailing=self,
+                recipient=delivery.recipient,
+                email=delivery.recipient.email,
+                error=f"Истекло время окончания рассылки. {delivery.last_error}",
+            )
+            for delivery in retries
+        )
+        retries.update(status="Не доставлено", next_attempt_at=None)
+
+    def send_mailing(self, engine=None, resume=False, stats=None):
+        """Отправка сообщений всем получателям и логирование попыток отправки.
+
+        С resume=True продолжает прерванную рассылку в статусе «Запущена»,
+        отправляя письма только тем, кому они еще не отправлялись. Возвращает False,
+        если рассылку нельзя запустить или продолжить.
+        """
+        if resume:
+            if not self.can_resume():
+                return False
+        elif not self.start():
+            return False
+
+        self.deliver(self.pending_recipients(), engine=engine, stats=stats)
+        self.finish()
+        return True
+
+    def can_resume(self):
+        """Проверяет, что прерванную рассылку можно продолжить"""
+        if self.is_blocked or self.status != "Запущена":
+            logging.info(f"Рассылку {self.pk} нельзя продолжить: {self.status}")
+            return False
+        return True
 
     def block_mailing(self):
         self.is_blocked = True
@@ -161,6 +469,18 @@ class Mailing(models.Model):
     class Meta:
         verbose_name = "Рассылка"
         verbose_name_plural = "Рассылки"
+        indexes = [
+            models.Index(
+                fields=["first_send_time"],
+                condition=models.Q(status="Создана", is_blocked=False),
+                name="mailing_due_idx",
+            ),
+            models.Index(
+                fields=["end_time"],
+                condition=models.Q(status="Запущена"),
+                name="mailing_running_end_idx",
+            ),
+        ]
         permissions = [
             ("can_view_all_mailings", "can view all mailings"),
             ("can_disable_mailings", "can disable mailings"),
@@ -173,10 +493,17 @@ class MailingAttempt(models.Model):
         ("Не успешно", "Не успешно"),
     ]
 
-    attempt_datetime = models.DateTimeField(auto_now_add=True)
+    attempt_datetime = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=10, choices=ATTEMPT_STATUS_CHOICES)
     server_response = models.TextField(blank=True)
     mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE)
+    recipient = models.ForeignKey(
+        Recipient,
+        verbose_name="Получатель",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
     owner = models.ForeignKey(
         CustomUser,
         verbose_name="Владелец",
@@ -188,24 +515,260 @@ class MailingAttempt(models.Model):
     def __str__(self):
         return f"Попытка: {self.status} at {self.attempt_datetime}"
 
+    @classmethod
+    def domain_stats(cls, attempts):
+        """Число попыток, успешных и скорость отправки (писем/с) по доменам получателей.
+
+        Скорость считается по времени между первой и последней попыткой домена, так как
+        рассылка отправляет получателей подряд по доменам.
+        """
+        rows = list(
+            attempts.annotate(domain=email_domain("recipient__email"))
+            .values("domain")
+            .annotate(
+                total=Count("pk"),
+                successful=Count("pk", filter=Q(status="Успешно")),
+                first=Min("attempt_datetime"),
+                last=Max("attempt_datetime"),
+            )
+            .order_by("domain")
+        )
+        for row in rows:
+            elapsed = (row["last"] - row["first"]).total_seconds()
+            row["rate"] = row["total"] / elapsed if elapsed else None
+        return rows
+
     class Meta:
         verbose_name = "Попытка рассылки"
         verbose_name_plural = "Попытка рассылок"
+        # Индексы под постраничный вывод журнала по курсору (attempt_datetime, id),
+        # в том числе с фильтром по рассылке или статусу
+        indexes = [
+            models.Index(
+                fields=["-attempt_datetime", "-id"], name="attempt_keyset_idx"
+            ),
+            models.Index(
+                fields=["mailing", "-attempt_datetime", "-id"],
+                name="attempt_mailing_keyset_idx",
+            ),
+            models.Index(
+                fields=["status", "-attempt_datetime", "-id"],
+                name="attempt_status_keyset_idx",
+            ),
+        ]
         permissions = [
             ("can_view_all_mailings_attempts", "can view all mailings attempts"),
         ]
 
 
+class MailingDelivery(models.Model):
+    STATUS_CHOICES = [
+        ("Отправка", "Отправка"),
+        ("Отправлено", "Отправлено"),
+        ("Повтор", "Повтор"),
+        ("Не доставлено", "Не доставлено"),
+        ("Исключено", "Исключено"),
+    ]
+
+    mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE)
+    recipient = models.ForeignKey(Recipient, on_delete=models.CASCADE)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES)
+    attempts = models.PositiveIntegerField(default=1)
+    next_attempt_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.recipient}: {self.status} (попыток: {self.attempts})"
+
+    class Meta:
+        verbose_name = "Доставка получателю"
+        verbose_name_plural = "Доставки получателям"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mailing", "recipient"], name="unique_mailing_delivery"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="Повтор"),
+                name="mailing_delivery_retry_idx",
+            ),
+        ]
+
+
+class DeadLetter(models.Model):
+    mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE)
+    recipient = models.ForeignKey(
+        Recipient, blank=True, null=True, on_delete=models.SET_NULL
+    )
+    email = models.EmailField()
+    code = models.PositiveSmallIntegerField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Недоставлено: {self.email} ({self.code})"
+
+    class Meta:
+        verbose_name = "Недоставленное письмо"
+        verbose_name_plural = "Недоставленные письма"
+
+
+class DomainThroughput:
+    """Считает письма рассылки по доменам и пишет в лог итог каждого домена.
+
+    Задания ставятся в отправку подряд по доменам (track), поэтому итог домена
+    пишется, как только задания перешли к следующему домену и по всем письмам
+    домена пришли результаты (add). Задания и результаты могут идти из разных
+    потоков, счетчики защищены блокировкой.
+    """
+
+    def __init__(self, mailing):
+        self.mailing = mailing
+        self.current = None
+        # домен -> [поставлено, отправлено, успешно, время первого задания]
+        self.domains = {}
+        self.lock = threading.Lock()
+
+    def track(self, jobs):
+        for recipient, email in jobs:
+            with self.lock:
+                if recipient.domain != self.current:
+                    previous, self.current = self.current, recipient.domain
+                    self.log_if_done(previous)
+                self.domains.setdefault(
+                    recipient.domain, [0, 0, 0, time.perf_counter()]
+                )[0] += 1
+            yield recipient, email
+        with self.lock:
+            previous, self.current = self.current, None
+            self.log_if_done(previous)
+
+    def add(self, domain, success):
+        with self.lock:
+            counters = self.domains[domain]
+            counters[1] += 1
+            counters[2] += success
+            self.log_if_done(domain)
+
+    def log_if_done(self, domain):
+        counters = self.domains.get(domain)
+        if domain == self.current or counters is None or counters[1] < counters[0]:
+            return
+        queued, sent, successful, started = self.domains.pop(domain)
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Рассылка {self.mailing.pk}, домен {domain}: успешно {successful} "
+            f"из {sent} писем за {elapsed:.2f} с "
+            f"({sent / elapsed if elapsed else 0:.1f} писем/с)"
+        )
+
+
+class AttemptBuffer:
+    """Копит результаты отправки в памяти и записывает их пачками через bulk_create.
+
+    Вместе с попытками копятся счетчики статистики пользователя (один UPDATE на пачку),
+    контрольные точки доставки по получателям и недоставленные письма. Все они
+    записываются в одной транзакции. Буфер сбрасывается каждые size записей
+    или interval секунд, а также при выходе из блока with, в том числе по исключению.
+    Если процесс убит до сброса, итоги последней пачки теряются, но получатели
+    остаются отмеченными Mailing.claim и повторно не отправляются.
+    """
+
+    def __init__(self, mailing, size=None, interval=None):
+        self.mailing = mailing
+        self.size = size or settings.MAILING_ATTEMPT_BUFFER_SIZE
+        self.interval = interval or settings.MAILING_ATTEMPT_FLUSH_INTERVAL
+        self.attempts = []
+        self.deliveries = []
+        self.dead_letters = []
+        self.successful = 0
+        self.failed = 0
+        self.flushed_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def add(self, attempt):
+        self.attempts.append(attempt)
+        if attempt.status == "Успешно":
+            self.successful += 1
+        else:
+            self.failed += 1
+        self.flush_if_due()
+
+    def checkpoint(self, delivery):
+        self.deliveries.append(delivery)
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if (
+            max(len(self.attempts), len(self.deliveries)) >= self.size
+            or time.monotonic() - self.flushed_at >= self.interval
+        ):
+            self.flush()
+
+    def dead_letter(self, dead_letter):
+        self.dead_letters.append(dead_letter)
+
+    def flush(self):
+        with transaction.atomic():
+            if self.attempts:
+                MailingAttempt.objects.bulk_create(self.attempts, batch_size=self.size)
+                self.attempts = []
+            if self.deliveries:
+                MailingDelivery.objects.bulk_create(
+                    self.deliveries,
+                    batch_size=self.size,
+                    update_conflicts=True,
+                    unique_fields=["mailing", "recipient"],
+                    update_fields=[
+                        "status",
+                        "attempts",
+                        "next_attempt_at",
+                        "last_error",
+                    ],
+                )
+                self.deliveries = []
+            if self.dead_letters:
+                DeadLetter.objects.bulk_create(self.dead_letters, batch_size=self.size)
+                # Несуществующие ящики больше не получают писем ни одной рассылки
+                Suppression.objects.bulk_create(
+                    (
+                        Suppression(email=letter.email.lower(), reason="Отказ")
+                        for letter in self.dead_letters
+                        if letter.code in HARD_BOUNCE_CODES
+                    ),
+                    batch_size=self.size,
+                    ignore_conflicts=True,
+                )
+                self.dead_letters = []
+            owner = self.mailing.owner
+            if owner is not None and (self.successful or self.failed):
+                UserMailingStatistics.increment(owner, self.successful, self.failed)
+        self.successful = 0
+        self.failed = 0
+        self.flushed_at = time.monotonic()
+
+
 class UserMailingStatistics(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
     total_mailings = models.PositiveIntegerField(default=0)
     successful_mailings = models.PositiveIntegerField(default=0)
     failed_mailings = models.PositiveIntegerField(default=0)
 
-    def update_statistics(self, success):
-        self.total_mailings += 1
-        if success:
-            self.successful_mailings += 1
-        else:
-            self.failed_mailings += 1
-        self.save()
+    @classmethod
+    def increment(cls, user, successful=0, failed=0):
+        """Атомарно увеличивает счетчики пользователя одним UPDATE с F()-выражениями"""
+        counters = {
+            "total_mailings": F("total_mailings") + successful + failed,
+            "successful_mailings": F("successful_mailings") + successful,
+            "failed_mailings": F("failed_mailings") + failed,
+        }
+        if not cls.objects.filter(user=user).update(**counters):
+            stats, created = cls.objects.get_or_create(user=user)
+            cls.objects.filter(pk=stats.pk).update(**counters)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import redis
+from django.conf import settings
+
+# Атомарно пополняет корзину по прошедшему времени (по часам Redis) и забирает
+# один токен. Возвращает 0, если токен выдан, иначе время ожидания в секундах.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+# Клиент Redis создается при первом обращении и общий для всех ограничителей процесса
+client = None
+
+
+def get_client():
+    global client
+    if client is None:
+        client = redis.Redis.from_url(settings.REDIS_URL)
+    return client
+
+
+class TokenBucket:
+    """Ограничитель скорости «token bucket», общий для всех процессов через Redis"""
+
+    def __init__(self, key, rate, burst, client):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def reserve(self):
+        """Пытается забрать токен, возвращает время ожидания (0 — токен получен)"""
+        return float(self.script(keys=[self.key], args=[self.rate, self.burst]))
+
+    def acquire(self):
+        while wait := self.reserve():
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Как acquire, но запрос к Redis выполняется в потоке, не блокируя event loop"""
+        loop = asyncio.get_running_loop()
+        while wait := await loop.run_in_executor(None, self.reserve):
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Набор корзин, из каждой из которых нужно получить токен перед отправкой письма"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+
+    def acquire(self):
+        for bucket in self.buckets:
+            bucket.acquire()
+
+    async def acquire_async(self):
+        for bucket in self.buckets:
+            await bucket.acquire_async()
+
+
+def get_rate_limiter(owner=None, domain=None):
+    """Собирает лимиты на SMTP-релей, владельца рассылки и домен получателя.
+
+    Возвращает None, если ни один лимит не включен.
+    """
+    limits = []
+    domain_rate = settings.MAILING_DOMAIN_LIMITS.get(domain, {}).get("rate")
+    if domain_rate:
+        limits.append((f"ratelimit:domain:{domain}", domain_rate))
+    if settings.MAILING_RATE_LIMIT_RELAY:
+        limits.append(
+            (
+                f"ratelimit:relay:{settings.EMAIL_HOST}",
+                settings.MAILING_RATE_LIMIT_RELAY,
+            )
+        )
+    if settings.MAILING_RATE_LIMIT_OWNER and owner is not None:
+        limits.append(
+            (f"ratelimit:owner:{owner.pk}", settings.MAILING_RATE_LIMIT_OWNER)
+        )
+    if not limits:
+        return None
+
+    return RateLimiter(
+        [
+            TokenBucket(key, rate, settings.MAILING_RATE_LIMIT_BURST, get_client())
+            for key, rate in limits
+        ]
+    )
@@ -0,0 +1,200 @@
+import logging
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import aiosmtplib
+from django.conf import settings
+from django.core.mail import get_connection
+
+from mail.async_sender import send_async
+
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+class BatchSender:
+    """Отправляет письма через одно SMTP-соединение, переоткрывая его каждые batch_size писем"""
+
+    def __init__(self, batch_size=None, connection=None):
+        self.batch_size = batch_size or settings.MAILING_BATCH_SIZE
+        self.connection = connection or get_connection(fail_silently=False)
+        self.sent_in_batch = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+        self.sent_in_batch = 0
+
+    def send(self, email):
+        """Отправляет письмо, при обрыве соединения переподключается и повторяет отправку один раз"""
+        if self.sent_in_batch >= self.batch_size:
+            self.close()
+        self.connection.open()
+        try:
+            self.connection.send_messages([email])
+        except RECONNECT_ERRORS as e:
+            logging.warning(f"SMTP-соединение разорвано, переподключение: {e}")
+            self.close()
+            self.connection.open()
+            self.connection.send_messages([email])
+        self.sent_in_batch += 1
+
+
+class SenderPool:
+    """Ограниченный пул SMTP-соединений, общий для потоков-отправителей"""
+
+    def __init__(self, size, batch_size=None):
+        self.senders = queue.Queue()
+        for _ in range(size):
+            self.senders.put(BatchSender(batch_size))
+
+    def deliver(self, key, email, limiter=None):
+        sender = self.senders.get()
+        try:
+            return key, deliver(sender, email, limiter)
+        finally:
+            self.senders.put(sender)
+
+    def close(self):
+        while not self.senders.empty():
+            self.senders.get_nowait().close()
+
+
+def deliver(sender, email, limiter=None):
+    """Отправляет письмо и возвращает исключение при ошибке или None при успехе"""
+    try:
+        if limiter is not None:
+            limiter.acquire()
+        sender.send(email)
+    except Exception as e:
+        logging.error(f"Ошибка отправки письма: {e}")
+        return e
+    return None
+
+
+def send_sequential(jobs, batch_size=None, limiter=None):
+    """Последовательно отправляет письма из пар (ключ, письмо), возвращая пары (ключ, ошибка)"""
+    with BatchSender(batch_size) as sender:
+        for key, email in jobs:
+            yield key, deliver(sender, email, limiter)
+
+
+def send_threaded(jobs, workers=None, batch_size=None, limiter=None):
+    """Отправляет письма пулом потоков, каждый поток берет соединение из SenderPool"""
+    workers = workers or settings.MAILING_WORKERS
+    pool = SenderPool(workers, batch_size)
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for key, email in jobs:
+                pending.add(executor.submit(pool.deliver, key, email, limiter))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in wait(pending).done:
+                yield future.result()
+    finally:
+        pool.close()
+
+
+class DeliveryStats:
+    """Собирает пропускную способность, задержки и ошибки отправки (потокобезопасно)"""
+
+    def __init__(self):
+        self.latencies = []
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def measure(self, jobs, send):
+        """Пропускает письма через send(jobs), замеряя время от постановки до результата"""
+        submitted = {}
+
+        def tracked_jobs():
+            for key, email in jobs:
+                submitted[id(key)] = time.perf_counter()
+                yield key, email
+
+        for key, error in send(tracked_jobs()):
+            self.record(time.perf_counter() - submitted.pop(id(key)), error is None)
+            yield key, error
+
+    def record(self, latency, success):
+        with self.lock:
+            self.latencies.append(latency)
+            if not success:
+                self.failed += 1
+
+    def percentile(self, fraction):
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0
+        return latencies[round(fraction * (len(latencies) - 1))]
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        count = len(self.latencies)
+        return (
+            f"{count} messages, {self.failed} failed in {elapsed:.2f}s "
+            f"({count / elapsed if elapsed else 0:.1f} messages/sec), "
+            f"latency p50 {self.percentile(0.5) * 1000:.1f} ms, "
+            f"p95 {self.percentile(0.95) * 1000:.1f} ms"
+        )
+
+
+def classify_error(error):
+    """Возвращает код ответа SMTP (или None) и признак временной ошибки.
+
+    Ответы 4xx, таймауты и обрывы соединения считаются временными, 5xx — постоянными.
+    """
+    code = None
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        code = next(iter(error.recipients.values()))[0]
+    elif isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        code = error.recipients[0].code
+    elif isinstance(error, smtplib.SMTPResponseException):
+        code = error.smtp_code
+    elif isinstance(error, aiosmtplib.SMTPResponseException):
+        code = error.code
+    elif isinstance(error, OSError):
+        return None, True
+
+    if code is None:
+        return None, False
+    return code, 400 <= code < 500
+
+
+def retry_delay(attempt):
+    """Экспоненциальная задержка перед повтором номер attempt со случайным разбросом"""
+    delay = min(
+        settings.MAILING_RETRY_MAX_DELAY,
+        settings.MAILING_RETRY_BASE_DELAY * 2 ** (attempt - 1),
+    )
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+ENGINES = {
+    "sequential": send_sequential,
+    "threaded": send_threaded,
+    "async": send_async,
+}
+
+
+def send_emails(jobs, engine=None, workers=None, **kwargs):
+    """Отправляет письма выбранным движком (по умолчанию settings.MAILING_ENGINE)"""
+    engine = engine or settings.MAILING_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Неизвестный движок отправки: {engine}")
+    if workers and engine != "sequential":
+        kwargs["workers"] = workers
+    return ENGINES[engine](jobs, **kwargs)
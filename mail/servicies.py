@@ -1,57 +1,38 @@
-from django.core.cache import cache
-
-from config.settings import CACHE_ENABLED
+from mail.cache_keys import (MAILING_LIST_KEY, MESSAGE_LIST_KEY,
+                             RECIPIENT_LIST_KEY, list_key, owner_key)
 from mail.models import Mailing, Message, Recipient
+from utils.cache import get_or_compute
+
+
+def get_list_from_cache(key, queryset, owner=None):
+    """Список объектов из кэша: общий или только объекты владельца owner"""
+    if owner is None:
+        return get_or_compute(list_key(key), lambda: list(queryset), name=key)
+    return get_or_compute(
+        owner_key(key, owner.pk),
+        lambda: list(queryset.filter(owner=owner)),
+        name=f"{key}:owner",
+    )
+
+
+def get_mailing_from_cache(owner=None):
+    """Получает список рассылок из кэша, если кэш пуст, получает данные из бд"""
+    return get_list_from_cache(
+        MAILING_LIST_KEY,
+        Mailing.objects.with_recipient_preview(),
+        owner,
+    )
+
+
+def get_message_from_cache(owner=None):
+    """Получает список сообщений из кэша, если кэш пуст, получает данные из бд"""
+    return get_list_from_cache(
+        MESSAGE_LIST_KEY, Message.objects.select_related("owner"), owner
+    )
 
 
-def get_mailing_from_cache():
-    """Получает данные из кэша, если кэш пуст, получает данные из бд"""
-    if not CACHE_ENABLED:
-        return Mailing.objects.all()
-    key = "mailing_list"
-    mailings = cache.get(key)
-    if mailings is not None:
-        return mailings
-    mailings = Mailing.objects.all()
-    cache.set(key, mailings)
-    return mailings
-
-
-def get_message_from_cache():
-    """Получает данные из кэша, если кэш пуст, получает данные из бд"""
-    if not CACHE_ENABLED:
-        return Message.objects.all()
-    key = "message_list"
-    messages = cache.get(key)
-    if messages is not None:
-        return messages
-    messages = Message.objects.all()
-    cache.set(key, messages)
-    return messages
-
-
-def get_recipient_from_cache():
-    """Получает данные из кэша, если кэш пуст, получает данные из бд"""
-    if not CACHE_ENABLED:
-        return Recipient.objects.all()
-    key = "recipient_list"
-    recipients = cache.get(key)
-    if recipients is not None:
-        return recipients
-    recipients = Recipient.objects.all()
-    cache.set(key, recipients)
-    return recipients
-
-
-def get_products_by_category(category_name):
-    """Получает продукты по имени категории из кэша или базы данных."""
-    key = f"products_by_category_{category_name}"
-    products = cache.get(key)
-
-    if products is not None:
-        return products
-
-    products = list(Mailing.objects.filter(category__name=category_name))
-    cache.set(key, products)
-
-    return products
+def get_recipient_from_cache(owner=None):
+    """Получает список получателей из кэша, если кэш пуст, получает данные из бд"""
+    return get_list_from_cache(
+        RECIPIENT_LIST_KEY, Recipient.objects.select_related("owner"), owner
+    )
@@ -0,0 +1,58 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from mail.cache_keys import invalidate_model_cache
+from mail.models import Mailing, Message, Recipient
+
+
+def touch_mailings(**filters):
+    """Обновляет updated_at рассылок, сбрасывая кэш их строк в шаблонах.
+
+    Возвращает id владельцев этих рассылок.
+    """
+    mailings = Mailing.objects.filter(**filters)
+    owner_ids = set(mailings.values_list("owner_id", flat=True))
+    mailings.update(updated_at=timezone.now())
+    return owner_ids
+
+
+@receiver(post_save, sender=Mailing)
+@receiver(post_delete, sender=Mailing)
+def invalidate_mailing_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш списков при сохранении или удалении рассылки"""
+    invalidate_model_cache(Mailing, [instance.owner_id])
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_message_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш сообщений и рассылок, в которых используется сообщение"""
+    invalidate_model_cache(
+        Message, [instance.owner_id, *touch_mailings(message=instance)]
+    )
+
+
+@receiver(post_save, sender=Recipient)
+@receiver(pre_delete, sender=Recipient)
+def invalidate_recipient_cache(sender, instance, **kwargs):
+    """Сбрасывает кэш получателей и рассылок, в которые входит получатель.
+
+    При удалении срабатывает до него, пока связи с рассылками еще существуют.
+    """
+    invalidate_model_cache(
+        Recipient, [instance.owner_id, *touch_mailings(recipients=instance)]
+    )
+
+
+@receiver(m2m_changed, sender=Mailing.recipients.through)
+def invalidate_mailing_recipients_cache(sender, instance, action, pk_set, **kwargs):
+    """Сбрасывает кэш рассылок при изменении их получателей"""
+    if isinstance(instance, Mailing):
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_model_cache(Mailing, touch_mailings(pk=instance.pk))
+    elif action in ("post_add", "post_remove"):
+        invalidate_model_cache(Mailing, touch_mailings(pk__in=pk_set))
+    elif action == "pre_clear":
+        invalidate_model_cache(Mailing, touch_mailings(recipients=instance))
@@ -0,0 +1,106 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from mail.cache_keys import invalidate_model_cache
+from mail.models import Mailing, MailingDelivery, Recipient
+
+
+@shared_task
+def start_mailing(mailing_id, engine=None, resume=False):
+    """Запускает рассылку: делит получателей на порции и отправляет их параллельными задачами.
+
+    С resume=True продолжает прерванную рассылку только для еще не обработанных получателей.
+    """
+    mailing = Mailing.objects.get(pk=mailing_id)
+    if not (mailing.can_resume() if resume else mailing.start()):
+        return
+
+    recipient_ids = (
+        mailing.pending_recipients()
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator()
+    )
+    chunks = []
+    while chunk := list(islice(recipient_ids, settings.MAILING_CHUNK_SIZE)):
+        chunks.append(send_mailing_chunk.s(mailing_id, chunk, engine))
+
+    if not chunks:
+        finish_mailing([], mailing_id)
+        return
+    chord(chunks)(finish_mailing.s(mailing_id))
+
+
+@shared_task
+def send_mailing_chunk(mailing_id, recipient_ids, engine=None):
+    """Отправляет письма одной порции получателей рассылки"""
+    mailing = Mailing.objects.select_related("message").get(pk=mailing_id)
+    # Повторно доставленная задача не отправит письма тем, кому они уже ушли
+    recipients = mailing.pending_recipients().filter(pk__in=recipient_ids)
+    return mailing.deliver(recipients, engine=engine)
+
+
+@shared_task
+def finish_mailing(results, mailing_id):
+    """Завершает рассылку, когда все порции обработаны и не осталось отложенных повторов"""
+    Mailing.objects.get(pk=mailing_id).finish()
+    return sum(results)
+
+
+@shared_task
+def dispatch_due_mailings():
+    """Запускает рассылки, у которых наступило время первой отправки, и закрывает истекшие"""
+    now = timezone.now()
+    expired = Mailing.objects.filter(status="Запущена", end_time__lte=now)
+    owner_ids = set(expired.values_list("owner_id", flat=True))
+    if expired.update(status="Завершена", updated_at=now):
+        invalidate_model_cache(Mailing, owner_ids)
+
+    due_ids = list(
+        Mailing.objects.due(now).values_list("pk", flat=True)[
+            : settings.MAILING_DISPATCH_BATCH_SIZE
+        ]
+    )
+    for mailing_id in due_ids:
+        start_mailing.delay(mailing_id)
+    return len(due_ids)
+
+
+@shared_task
+def process_delivery_retries():
+    """Повторно отправляет письма, у которых подошло время повтора, пачками по рассылкам"""
+    now = timezone.now()
+    with transaction.atomic():
+        retries = list(
+            MailingDelivery.objects.select_for_update(skip_locked=True)
+            .filter(status="Повтор", next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[: settings.MAILING_RETRY_BATCH_SIZE]
+        )
+        # Продлеваем срок, чтобы следующий запуск не взял эти письма, пока идет отправка
+        MailingDelivery.objects.filter(pk__in=[retry.pk for retry in retries]).update(
+            next_attempt_at=now + timedelta(seconds=settings.MAILING_RETRY_LEASE)
+        )
+
+    by_mailing = defaultdict(dict)
+    for retry in retries:
+        by_mailing[retry.mailing_id][retry.recipient_id] = retry
+
+    mailings = Mailing.objects.select_related("message", "owner").in_bulk(by_mailing)
+    for mailing_id, deliveries in by_mailing.items():
+        mailing = mailings[mailing_id]
+        if mailing.is_expired():
+            mailing.abandon_retries()
+        else:
+            recipients = Recipient.objects.filter(pk__in=deliveries)
+            mailing.deliver(recipients, deliveries=deliveries)
+        # Пока первый проход рассылки не дошел до всех получателей, ее завершит
+        # он сам: иначе прерванную рассылку нельзя будет продолжить через resume
+        if mailing.is_expired() or not mailing.pending_recipients().exists():
+            mailing.finish()
+    return len(retries)
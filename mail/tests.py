@@ -1,3 +1,380 @@
-from django.test import TestCase
+import asyncio
+import io
+import smtplib
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from mail.async_sender import AsyncSenderPool, send_async
+from mail.cache_keys import list_key, owner_key
+from mail.models import (AttemptBuffer, DeadLetter, Mailing, MailingAttempt,
+                         MailingDelivery, Message, Recipient, Suppression)
+from mail.tasks import process_delivery_retries
+from users.models import CustomUser
+from utils.cache import get_or_compute, local_cache
+from utils.smtp_sink import SMTPSink
+
+
+class SendAsyncTest(SimpleTestCase):
+    """Отправка asyncio-движком на локальный SMTP-сервер"""
+
+    def send(self, sink, count):
+        jobs = (
+            (
+                i,
+                EmailMessage(
+                    "Тема", "Текст", "sender@example.com", [f"r{i}@example.com"]
+                ),
+            )
+            for i in range(count)
+        )
+        with override_settings(
+            EMAIL_HOST=sink.host,
+            EMAIL_PORT=sink.port,
+            EMAIL_USE_SSL=False,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="sender@example.com",
+            EMAIL_HOST_PASSWORD="",
+        ):
+            return dict(send_async(jobs, workers=3, batch_size=2))
+
+    def test_sends_without_login_when_password_is_empty(self):
+        with SMTPSink() as sink:
+            results = self.send(sink, 10)
+        self.assertEqual(results, {i: None for i in range(10)})
+        self.assertEqual(sink.received, 10)
+
+    def test_slow_message_does_not_hold_back_others(self):
+        async def deliver(pool, key, email):
+            await asyncio.sleep(1 if key == 0 else 0.01)
+            return key, None
+
+        jobs = ((i, None) for i in range(20))
+        started = time.perf_counter()
+        with mock.patch.object(AsyncSenderPool, "deliver", deliver):
+            keys = [key for key, error in send_async(jobs, workers=1)]
+        # Остальные 19 писем уходят, пока первое еще отправляется
+        self.assertEqual(keys[-1], 0)
+        self.assertEqual(sorted(keys), list(range(20)))
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_returns_error_for_rejected_message(self):
+        with SMTPSink(error_rate=1) as sink:
+            results = self.send(sink, 3)
+        self.assertEqual(sink.rejected, 3)
+        for error in results.values():
+            self.assertEqual(error.code, 451)
+
+
+@override_settings(CACHE_ENABLED=False)
+class ListQueryCountTest(TestCase):
+    """Число запросов списков рассылок и попыток не зависит от числа строк"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(
+            email="owner@example.com", is_staff=True, is_superuser=True
+        )
+        self.client.force_login(self.user)
+
+    def add_mailings(self, count):
+        message = Message.objects.create(subject="Тема", body="Текст", owner=self.user)
+        for i in range(count):
+            mailing = Mailing.objects.create(message=message, owner=self.user)
+            mailing.recipients.set(
+                Recipient.objects.create(
+                    email=f"r{mailing.pk}-{j}@example.com", full_name=f"Получатель {j}"
+                )
+                for j in range(7)
+            )
+            MailingAttempt.objects.bulk_create(
+                MailingAttempt(mailing=mailing, status="Успешно", owner=self.user)
+                for _ in range(2)
+            )
+
+    def assert_constant_queries(self, url_name, num):
+        for count in (3, 27):
+            self.add_mailings(count)
+            caches["fragments"].clear()
+            with self.subTest(rows=Mailing.objects.count()), self.assertNumQueries(num):
+                response = self.client.get(reverse(f"mail:{url_name}"))
+            self.assertEqual(response.status_code, 200)
+
+    def test_mailing_list(self):
+        self.assert_constant_queries("mailing_list", 5)
+
+    def test_mailing_attempt_list(self):
+        self.assert_constant_queries("mailing_attempt_list", 6)
+
+
+@override_settings(
+    CACHE_ENABLED=False,
+    EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    EMAIL_USE_SSL=False,
+    EMAIL_USE_TLS=False,
+    EMAIL_HOST_USER="",
+    EMAIL_HOST_PASSWORD="",
+    DEFAULT_FROM_EMAIL="sender@example.com",
+    MAILING_BATCH_SIZE=100,
+)
+class DeliverConnectionsTest(TestCase):
+    """Рассылка на много доменов отправляется через общий пул соединений"""
+
+    def setUp(self):
+        message = Message.objects.create(subject="Тема", body="Текст")
+        self.mailing = Mailing.objects.create(message=message)
+        self.mailing.recipients.set(
+            Recipient.objects.bulk_create(
+                Recipient(email=f"r{i}@d{i}.example.com", full_name=f"Получатель {i}")
+                for i in range(200)
+            )
+        )
+
+    def send(self):
+        with SMTPSink() as sink, override_settings(
+            EMAIL_HOST=sink.host, EMAIL_PORT=sink.port
+        ):
+            self.mailing.send_mailing(engine="sequential")
+        self.assertEqual(sink.received, 200)
+        return sink.connections
+
+    def test_one_pool_for_all_domains(self):
+        self.assertEqual(self.send(), 2)
+
+    @override_settings(MAILING_DOMAIN_LIMITS={"d0.example.com": {"workers": 1}})
+    def test_separate_pool_for_limited_domain(self):
+        self.assertEqual(self.send(), 3)
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    """Отклоняет адреса soft* временной ошибкой 451, hard* — постоянной 550"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            to = message.to[0]
+            if to.startswith("soft"):
+                raise smtplib.SMTPRecipientsRefused({to: (451, b"Try later")})
+            if to.startswith("hard"):
+                raise smtplib.SMTPRecipientsRefused({to: (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    CACHE_ENABLED=False,
+    EMAIL_BACKEND="mail.tests.FailingEmailBackend",
+    DEFAULT_FROM_EMAIL="sender@example.com",
+    MAILING_RETRY_MAX_ATTEMPTS=2,
+)
+class DeliveryRetryTest(TestCase):
+    """Повторы временных ошибок, недоставленные письма и продолжение рассылки"""
+
+    def setUp(self):
+        message = Message.objects.create(subject="Тема", body="Текст")
+        self.mailing = Mailing.objects.create(message=message)
+        self.mailing.recipients.set(
+            Recipient.objects.create(email=email, full_name="Получатель")
+            for email in (
+                "ok0@example.com",
+                "ok1@example.com",
+                "ok2@example.com",
+                "soft@example.com",
+                "hard@example.com",
+            )
+        )
+
+    def deliveries(self):
+        return dict(
+            MailingDelivery.objects.filter(mailing=self.mailing).values_list(
+                "recipient__email", "status"
+            )
+        )
+
+    def make_retries_due(self):
+        MailingDelivery.objects.filter(status="Повтор").update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_transient_errors_are_retried_and_permanent_dead_lettered(self):
+        self.mailing.send_mailing()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(self.deliveries()["soft@example.com"], "Повтор")
+        self.assertEqual(self.deliveries()["hard@example.com"], "Не доставлено")
+        self.assertEqual(
+            list(DeadLetter.objects.values_list("email", "code")),
+            [("hard@example.com", 550)],
+        )
+        self.assertTrue(Suppression.objects.filter(email="hard@example.com").exists())
+        self.mailing.refresh_from_db()
+        self.assertEqual(self.mailing.status, "Запущена")
+
+        self.make_retries_due()
+        self.assertEqual(process_delivery_retries(), 1)
+
+        self.assertEqual(self.deliveries()["soft@example.com"], "Не доставлено")
+        self.assertEqual(DeadLetter.objects.get(email="soft@example.com").code, 451)
+        self.mailing.refresh_from_db()
+        self.assertEqual(self.mailing.status, "Завершена")
+
+    def test_retry_does_not_finish_mailing_with_pending_recipients(self):
+        self.mailing.start()
+        MailingDelivery.objects.create(
+            mailing=self.mailing,
+            recipient=Recipient.objects.get(email="ok0@example.com"),
+            status="Повтор",
+            next_attempt_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        process_delivery_retries()
+
+        self.mailing.refresh_from_db()
+        self.assertEqual(self.mailing.status, "Запущена")
+        self.assertTrue(self.mailing.can_resume())
+        self.assertEqual([message.to for message in mail.outbox], [["ok0@example.com"]])
+
+    def test_resume_sends_only_to_pending_recipients(self):
+        self.mailing.start()
+        MailingDelivery.objects.create(
+            mailing=self.mailing,
+            recipient=Recipient.objects.get(email="ok0@example.com"),
+            status="Отправлено",
+        )
+
+        self.mailing.send_mailing(resume=True)
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["ok1@example.com", "ok2@example.com"],
+        )
+        self.assertEqual(MailingAttempt.objects.filter(mailing=self.mailing).count(), 4)
+
+        # Повторное продолжение не отправляет письма уже обработанным получателям
+        self.mailing.send_mailing(resume=True)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_resume_after_lost_buffer_does_not_resend(self):
+        # Воркер убит до записи итогов и до завершения рассылки
+        with mock.patch.object(AttemptBuffer, "flush"), mock.patch.object(
+            Mailing, "finish"
+        ):
+            self.mailing.send_mailing()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(set(self.deliveries().values()), {"Отправка"})
+        self.assertFalse(self.mailing.pending_recipients().exists())
+
+        self.mailing.send_mailing(resume=True)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+@override_settings(
+    CACHE_ENABLED=False,
+    EMAIL_BACKEND="mail.tests.FailingEmailBackend",
+    DEFAULT_FROM_EMAIL="sender@example.com",
+)
+class DomainDeliveryTest(TestCase):
+    """Отправка подряд по доменам и скорость по доменам в журнале попыток"""
+
+    def test_sends_by_domain_and_reports_domain_stats(self):
+        message = Message.objects.create(subject="Тема", body="Текст")
+        mailing = Mailing.objects.create(message=message)
+        mailing.recipients.set(
+            Recipient.objects.create(email=email, full_name="Получатель")
+            for email in (
+                "a@mail.ru",
+                "b@Gmail.com",
+                "c@yandex.ru",
+                "hard@mail.ru",
+                "d@gmail.com",
+                "e@mail.ru",
+            )
+        )
+
+        mailing.send_mailing()
+
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            ["b@Gmail.com", "d@gmail.com", "a@mail.ru", "e@mail.ru", "c@yandex.ru"],
+        )
+        stats = MailingAttempt.domain_stats(mailing.mailingattempt_set.all())
+        self.assertEqual(
+            [(row["domain"], row["total"], row["successful"]) for row in stats],
+            [("gmail.com", 2, 2), ("mail.ru", 3, 2), ("yandex.ru", 1, 1)],
+        )
+
+
+@override_settings(
+    CACHE_ENABLED=False,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    DEFAULT_FROM_EMAIL="sender@example.com",
+)
+class StartMailingCommandTest(TestCase):
+    """Команда start_mailing сообщает о пропущенных рассылках"""
+
+    def setUp(self):
+        message = Message.objects.create(subject="Тема", body="Текст")
+        self.mailing = Mailing.objects.create(message=message)
+        self.mailing.recipients.add(
+            Recipient.objects.create(email="r@example.com", full_name="Получатель")
+        )
+
+    def call(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("start_mailing", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_blocked_mailing_is_not_reported_started(self):
+        self.mailing.block_mailing()
+        stdout, stderr = self.call(self.mailing.pk)
+        self.assertIn("is blocked", stderr)
+        self.assertNotIn("started", stdout)
+        self.assertEqual(mail.outbox, [])
+
+    def test_mailing_that_did_not_start_is_reported_skipped(self):
+        with mock.patch.object(Mailing, "start", return_value=False):
+            stdout, stderr = self.call(self.mailing.pk)
+        self.assertIn(f"Mailing with id {self.mailing.pk} skipped", stderr)
+        self.assertNotIn("started", stdout)
+
+    def test_due_cannot_be_resumed(self):
+        with self.assertRaisesMessage(CommandError, "--resume"):
+            self.call("--due", "--resume")
+
+
+@override_settings(
+    CACHE_ENABLED=True,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class CacheVersionTest(SimpleTestCase):
+    """Версии списков читаются из общего кэша, а не из кэша процесса"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.entries.clear()
+
+    def test_version_bumped_by_another_process_is_seen_immediately(self):
+        key = list_key("mailing_list")
+        self.assertEqual(get_or_compute(key, lambda: ["old"]), ["old"])
+
+        # Другой процесс увеличил версию в Redis, не трогая LocalCache этого
+        cache.incr("version:mailing_list")
+
+        self.assertNotEqual(list_key("mailing_list"), key)
+        self.assertEqual(
+            get_or_compute(list_key("mailing_list"), lambda: ["new"]), ["new"]
+        )
+
+    def test_owner_key_depends_on_list_and_owner_versions(self):
+        key = owner_key("mailing_list", 1)
+        cache.incr("version:mailing_list")
+        self.assertNotEqual(owner_key("mailing_list", 1), key)
+        key = owner_key("mailing_list", 1)
+        cache.incr("owner_version:1")
+        self.assertNotEqual(owner_key("mailing_list", 1), key)
@@ -1,25 +1,23 @@
 from django.urls import path
-from django.views.decorators.cache import cache_page
 
 from mail.apps import MailConfig
-from mail.views import (BlockMailingView, HomePageView, MailingAttemptListView,
-                        MailingClearAttemptsView, MailingCreateView,
-                        MailingDeleteView, MailingDetailView, MailingListView,
-                        MailingStartView, MailingUpdateView, MessageCreateView,
+from mail.views import (BlockMailingView, ExportView, HomePageView,
+                        MailingAttemptListView, MailingClearAttemptsView,
+                        MailingCreateView, MailingDeleteView,
+                        MailingDetailView, MailingListView, MailingStartView,
+                        MailingUpdateView, MessageCreateView,
                         MessageDeleteView, MessageDetailView, MessageListView,
                         MessageUpdateView, RecipientCreateView,
                         RecipientDeleteView, RecipientDetailView,
-                        RecipientListView, RecipientUpdateView,
-                        UserMailingStatisticsView)
+                        RecipientImportView, RecipientListView,
+                        RecipientUpdateView, UserMailingStatisticsView)
 
 app_name = MailConfig.name
 
 
 urlpatterns = [
     path("home/", HomePageView.as_view(), name="home"),
-    path(
-        "message_list/", cache_page(30)(MessageListView.as_view()), name="message_list"
-    ),
+    path("message_list/", MessageListView.as_view(), name="message_list"),
     path("message_create/", MessageCreateView.as_view(), name="message_create"),
     path("message/<int:pk>/update", MessageUpdateView.as_view(), name="message_update"),
     path(
@@ -29,10 +27,9 @@ urlpatterns = [
         "message/<int:pk>/detail/", MessageDetailView.as_view(), name="message_detail"
     ),
     path("recipient/<int:pk>/", RecipientDetailView.as_view(), name="recipient_detail"),
-    path(
-        "recipient/", cache_page(30)(RecipientListView.as_view()), name="recipient_list"
-    ),
+    path("recipient/", RecipientListView.as_view(), name="recipient_list"),
     path("recipient_form/", RecipientCreateView.as_view(), name="recipient_form"),
+    path("recipient/import/", RecipientImportView.as_view(), name="recipient_import"),
     path(
         "recipient/update/<int:pk>/",
         RecipientUpdateView.as_view(),
@@ -43,9 +40,7 @@ urlpatterns = [
         RecipientDeleteView.as_view(),
         name="recipient_delete",
     ),
-    path(
-        "mailing_list/", cache_page(30)(MailingListView.as_view()), name="mailing_list"
-    ),
+    path("mailing_list/", MailingListView.as_view(), name="mailing_list"),
     path("mailing_create/", MailingCreateView.as_view(), name="mailing_create"),
     path("mailing/<int:pk>/update", MailingUpdateView.as_view(), name="mailing_update"),
     path("mailing/<int:pk>/delete", MailingDeleteView.as_view(), name="mailing_delete"),
@@ -65,6 +60,7 @@ urlpatterns = [
         MailingClearAttemptsView.as_view(),
         name="clear_mailing_attempts",
     ),
+    path("export/<str:name>/", ExportView.as_view(), name="export"),
     path(
         "user/statistics/", UserMailingStatisticsView.as_view(), name="user_statistics"
     ),
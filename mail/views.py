@@ -1,17 +1,27 @@
+import io
+
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponseForbidden
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView, View)
 
-from mail.forms import MailingForm, MessageForm, RecipientForm
+from mail.exporter import EXPORTS, FORMATS, export
+from mail.forms import (MailingForm, MessageForm, RecipientForm,
+                        RecipientImportForm)
+from mail.importer import import_recipients
 from mail.models import (Mailing, MailingAttempt, Message, Recipient,
                          UserMailingStatistics)
+from mail.sender import ENGINES
 from mail.servicies import (get_mailing_from_cache, get_message_from_cache,
                             get_recipient_from_cache)
+from mail.tasks import start_mailing
 from utils.logger import setup_logging
+from utils.pagination import keyset_page
 
 setup_logging()
 
@@ -40,13 +50,12 @@ class MailingListView(LoginRequiredMixin, ListView):
     context_object_name = "mailing_list"
 
     def get_queryset(self):
-        if self.request.user.is_superuser or self.request.user.has_permission(
-            "can_view_all_mailings"
+        if self.request.user.is_superuser or self.request.user.has_perm(
+            "mail.can_view_all_mailings"
         ):
             return get_mailing_from_cache()
         else:
-            user = self.request.user
-            return Mailing.objects.filter(owner=user)
+            return get_mailing_from_cache(owner=self.request.user)
 
 
 class MailingCreateView(View):
@@ -109,11 +118,17 @@ class MailingStartView(View):
 
     def get(self, request, mailing_id):
         mailing = get_object_or_404(Mailing, id=mailing_id)
-        return render(request, "mail/mailing_start.html", {"object": mailing})
+        return render(
+            request, "mail/mailing_start.html", {"object": mailing, "engines": ENGINES}
+        )
 
     def post(self, request, mailing_id):
         mailing = get_object_or_404(Mailing, id=mailing_id)
-        mailing.send_mailing()
+        engine = request.POST.get("engine")
+        start_mailing.delay(mailing.pk, engine if engine in ENGINES else None)
+        messages.success(
+            request, f"Рассылка {mailing.pk} поставлена в очередь на отправку."
+        )
         return redirect("mail:mailing_attempt_list")
 
 
@@ -124,19 +139,18 @@ class MailingClearAttemptsView(View):
         return redirect("mail:mailing_attempt_list")
 
 
-class MessageListView(ListView):
+class MessageListView(LoginRequiredMixin, ListView):
     model = Message
     template_name = "mail/message_list.html"
     context_object_name = "message_list"
 
     def get_queryset(self):
-        if self.request.user.is_superuser or self.request.user.has_permission(
-            "can_view_all_messages"
+        if self.request.user.is_superuser or self.request.user.has_perm(
+            "mail.can_view_all_messages"
         ):
             return get_message_from_cache()
         else:
-            user = self.request.user
-            return Mailing.objects.filter(owner=user)
+            return get_message_from_cache(owner=self.request.user)
 
 
 class MessageCreateView(CreateView):
@@ -196,19 +210,18 @@ class RecipientDetailView(DetailView):
     context_object_name = "recipient"
 
 
-class RecipientListView(ListView):
+class RecipientListView(LoginRequiredMixin, ListView):
     model = Recipient
     template_name = "mail/recipient_list.html"
     context_object_name = "recipient_list"
 
     def get_queryset(self):
-        if self.request.user.is_superuser or self.request.user.has_permission(
-            "can_view_all_recipients"
+        if self.request.user.is_superuser or self.request.user.has_perm(
+            "mail.can_view_all_recipients"
         ):
             return get_recipient_from_cache()
         else:
-            user = self.request.user
-            return Mailing.objects.filter(owner=user)
+            return get_recipient_from_cache(owner=self.request.user)
 
 
 class RecipientCreateView(CreateView):
@@ -223,6 +236,29 @@ class RecipientCreateView(CreateView):
         return super().form_valid(form)
 
 
+class RecipientImportView(LoginRequiredMixin, View):
+    template_name = "mail/recipient_import.html"
+
+    def get(self, request):
+        form = RecipientImportForm(user=request.user)
+        return render(request, self.template_name, {"form": form})
+
+    def post(self, request):
+        form = RecipientImportForm(request.POST, request.FILES, user=request.user)
+        if not form.is_valid():
+            return render(request, self.template_name, {"form": form})
+
+        # Файл читается построчно, без загрузки целиком в память
+        lines = io.TextIOWrapper(form.cleaned_data["file"], encoding="utf-8-sig")
+        result = import_recipients(
+            lines, owner=request.user, mailing=form.cleaned_data["mailing"]
+        )
+        messages.success(request, f"Импорт завершен. {result}")
+        for error in result.errors:
+            messages.warning(request, error)
+        return redirect("mail:recipient_list")
+
+
 class RecipientUpdateView(LoginRequiredMixin, UpdateView):
     model = Recipient
     fields = ["email", "full_name", "comment"]
@@ -257,17 +293,74 @@ class RecipientDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return redirect("mail:recipient_list")
 
 
-class MailingAttemptListView(ListView):
+class MailingAttemptListView(LoginRequiredMixin, ListView):
+    """Журнал попыток рассылок: страницы по курсору ?after=, фильтры ?mailing= и ?status="""
+
     model = MailingAttempt
     template_name = "mail/mailing_attempt_list.html"
     context_object_name = "mailing_attempt_list"
+    page_size = 50
+
+    def get_queryset(self):
+        queryset = MailingAttempt.objects.all()
+        if not self.request.user.has_perm("mail.can_view_all_mailings_attempts"):
+            queryset = queryset.filter(mailing__owner=self.request.user)
+        mailing_id = self.request.GET.get("mailing", "")
+        if mailing_id.isdigit():
+            queryset = queryset.filter(mailing_id=mailing_id)
+        status = self.request.GET.get("status")
+        if status in dict(MailingAttempt.ATTEMPT_STATUS_CHOICES):
+            queryset = queryset.filter(status=status)
+        # Скорость по доменам показывается для журнала одной рассылки
+        self.domain_stats = (
+            MailingAttempt.domain_stats(queryset) if mailing_id.isdigit() else None
+        )
+
+        # Рассылки подгружаются отдельным запросом по одной на все их попытки
+        queryset = queryset.prefetch_related(
+            Prefetch("mailing", queryset=Mailing.objects.with_recipient_preview())
+        )
+        attempts, self.next_cursor = keyset_page(
+            queryset, "attempt_datetime", self.request.GET.get("after"), self.page_size
+        )
+        return attempts
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["mailings"] = Mailing.objects.all()
+        context["next_cursor"] = self.next_cursor
+        context["statuses"] = MailingAttempt.ATTEMPT_STATUS_CHOICES
+        context["domain_stats"] = self.domain_stats
         return context
 
 
+class ExportView(LoginRequiredMixin, View):
+    """Потоковая выгрузка получателей или попыток рассылок в CSV/JSONL (?format=, ?gzip=1)"""
+
+    def get(self, request, name):
+        export_format = request.GET.get("format", "csv")
+        if name not in EXPORTS or export_format not in FORMATS:
+            raise Http404
+        compress = request.GET.get("gzip") == "1"
+
+        queryset = EXPORTS[name][0]
+        if name == "recipients" and not request.user.has_perm(
+            "mail.can_view_all_recipients"
+        ):
+            queryset = queryset.filter(owner=request.user)
+        elif name == "attempts" and not request.user.has_perm(
+            "mail.can_view_all_mailings_attempts"
+        ):
+            queryset = queryset.filter(mailing__owner=request.user)
+
+        filename = f"{name}.{export_format}" + (".gz" if compress else "")
+        response = StreamingHttpResponse(
+            export(name, export_format, compress, queryset),
+            content_type=FORMATS[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class UserMailingStatisticsView(View):
     def get(self, request):
         user_stats, created = UserMailingStatistics.objects.get_or_create(
@@ -0,0 +1,193 @@
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Коэффициент досрочного пересчета: чем больше, тем раньше пересчитывается значение
+EARLY_RECOMPUTE_BETA = 1.0
+LOCK_POLL_INTERVAL = 0.05
+MISSING = object()
+
+# Счетчики попаданий и промахов кэша по ключам (в пределах процесса)
+hits = Counter()
+local_hits = Counter()
+misses = Counter()
+stats_lock = threading.Lock()
+stats_logged_at = time.monotonic()
+
+
+class LocalCache:
+    """Ограниченный по размеру LRU-кэш процесса с коротким временем жизни записей"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+local_cache = LocalCache(settings.CACHE_LOCAL_MAXSIZE, settings.CACHE_LOCAL_TTL)
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, name=None):
+    """Возвращает значение из кэша, при промахе вычисляет compute() и сохраняет его.
+
+    Значение ищется сначала в LocalCache процесса, затем в общем кэше (Redis).
+    При промахе compute() выполняет только один процесс, взявший блокировку,
+    остальные ждут его результата. Незадолго до истечения срока значение с
+    небольшой вероятностью пересчитывается заранее (XFetch), чтобы популярный
+    ключ не истекал у всех одновременно.
+
+    compute должен возвращать вычисленный, сериализуемый результат (список, словарь),
+    а не ленивый QuerySet. Попадания и промахи считаются по name (по умолчанию key).
+    """
+    name = name or key
+    if not settings.CACHE_ENABLED:
+        return compute()
+    log_stats_if_due()
+
+    value = local_cache.get(key)
+    if value is not MISSING:
+        hits[name] += 1
+        local_hits[name] += 1
+        return value
+
+    entry = cache.get(key)
+    if entry is not None and not should_recompute(entry):
+        hits[name] += 1
+        local_cache.set(key, entry[0])
+        return entry[0]
+
+    misses[name] += 1
+    if entry is not None:
+        # Досрочный пересчет: остальные процессы пока читают прежнее значение
+        return store(key, compute, timeout)
+
+    lock_key = f"lock:{key}"
+    if cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+        try:
+            return store(key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            local_cache.set(key, entry[0])
+            return entry[0]
+    return store(key, compute, timeout)
+
+
+def should_recompute(entry):
+    """Решает по схеме XFetch, пора ли пересчитать значение до истечения срока"""
+    value, delta, expires_at = entry
+    if expires_at is None:
+        return False
+    return (
+        time.time() - delta * EARLY_RECOMPUTE_BETA * math.log(random.random())
+        >= expires_at
+    )
+
+
+def store(key, compute, timeout):
+    """Вычисляет значение и сохраняет его вместе с временем вычисления и сроком"""
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = cache.default_timeout
+    expires_at = time.time() + timeout if timeout is not None else None
+    cache.set(key, (value, delta, expires_at), timeout)
+    local_cache.set(key, value)
+    return value
+
+
+def get_versions(*keys):
+    """Текущие значения счетчиков версий keys одним запросом к кэшу.
+
+    Недостающий счетчик создается со значением текущего времени в наносекундах,
+    поэтому после вытеснения из кэша версия не вернется к уже использованному
+    значению. Версии всегда читаются из общего кэша, а не из LocalCache: иначе
+    изменения из других процессов были бы видны только через CACHE_LOCAL_TTL.
+    """
+    if not settings.CACHE_ENABLED:
+        return [0] * len(keys)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    """Увеличивает счетчик версий, делая устаревшими все ключи прежней версии"""
+    if not settings.CACHE_ENABLED:
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def cache_stats():
+    """Попадания (в том числе в LocalCache), промахи и доля попаданий по ключам"""
+    return {
+        key: {
+            "hits": hits[key],
+            "local_hits": local_hits[key],
+            "misses": misses[key],
+            "hit_rate": hits[key] / (hits[key] + misses[key]),
+        }
+        for key in hits.keys() | misses.keys()
+    }
+
+
+def log_stats_if_due():
+    """Пишет в лог cache_stats() процесса не чаще раза в CACHE_STATS_INTERVAL секунд"""
+    global stats_logged_at
+    if not settings.CACHE_STATS_INTERVAL:
+        return
+    with stats_lock:
+        if time.monotonic() - stats_logged_at < settings.CACHE_STATS_INTERVAL:
+            return
+        stats_logged_at = time.monotonic()
+    for name, stats in sorted(cache_stats().items()):
+        logging.info(
+            f"Кэш {name} (процесс {os.getpid()}): попаданий {stats['hits']}, "
+            f"из них в LocalCache {stats['local_hits']}, промахов {stats['misses']}, "
+            f"доля попаданий {stats['hit_rate']:.0%}"
+        )
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(moment, pk):
+    """Курсор страницы из времени (в микросекундах) и id последней строки"""
+    return f"{(moment - EPOCH) // timedelta(microseconds=1)}.{pk}"
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор, возвращает (время, id) или None для некорректного курсора"""
+    microseconds, _, pk = (cursor or "").partition(".")
+    if not (microseconds.isdigit() and pk.isdigit()):
+        return None
+    return EPOCH + timedelta(microseconds=int(microseconds)), int(pk)
+
+
+def keyset_page(queryset, field, cursor, size):
+    """Страница из size строк, идущих после cursor в порядке убывания (field, id).
+
+    Вместо OFFSET используется условие «field <= время и не (field = время и
+    id >= id)», которое читает индекс (field, id) с позиции курсора, поэтому любая
+    страница стоит как первая. Возвращает строки и курсор следующей страницы
+    (None, если она последняя).
+    """
+    queryset = queryset.order_by(f"-{field}", "-id")
+    position = decode_cursor(cursor)
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(**{f"{field}__lte": moment}).exclude(
+            **{field: moment, "id__gte": pk}
+        )
+    rows = list(queryset[: size + 1])
+    if len(rows) <= size:
+        return rows, None
+    last = rows[size - 1]
+    return rows[:size], encode_cursor(getattr(last, field), last.pk)
@@ -0,0 +1,88 @@
+import asyncio
+import random
+import threading
+
+
+class SMTPSink:
+    """Локальный SMTP-сервер на asyncio, который принимает письма и отбрасывает их.
+
+    latency — искусственная задержка ответа на письмо в секундах, error_rate — доля
+    писем, отклоняемых временной ошибкой 451.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0, error_rate=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.connections = 0
+        self.received = 0
+        self.rejected = 0
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Запускает сервер в отдельном потоке со своим event loop"""
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+            )
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.close()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 sink ESMTP\r\n")
+        try:
+            while line := await reader.readline():
+                command = line[:4].upper()
+                if command in (b"EHLO", b"HELO"):
+                    writer.write(b"250 sink\r\n")
+                elif command == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    while (line := await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self.error_rate and random.random() < self.error_rate:
+                        self.rejected += 1
+                        writer.write(b"451 Temporary failure\r\n")
+                    else:
+                        self.received += 1
+                        writer.write(b"250 OK queued\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    break
+                elif command in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    writer.write(b"250 OK\r\n")
+                else:
+                    writer.write(b"502 Command not implemented\r\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()